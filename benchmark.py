@@ -0,0 +1,238 @@
+"""Benchmarks for SpaceDB Viewer on synthetic SQLite databases.
+
+Generates a database of the requested shape (or reuses one generated
+before), then times the viewer's core paths headlessly on the offscreen Qt
+platform and prints the results as JSON, so runs on different commits can
+be compared:
+
+    python benchmark.py --scale wide-schema --output before.json
+    python benchmark.py --scale wide-schema --compare before.json
+
+The generated data is deterministic: the same parameters always give the
+same database.
+"""
+import os
+import sys
+import json
+import time
+import sqlite3
+import argparse
+import platform
+import statistics
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from PyQt6.QtWidgets import QApplication
+
+import db_viewer
+
+# tables, columns per table, rows per table, foreign keys per table, BLOB bytes
+SCALES = {
+    "small": dict(tables=20, columns=8, rows=10_000, fk_density=1.0, blob_size=0),
+    "wide-schema": dict(tables=2_000, columns=12, rows=100, fk_density=1.5, blob_size=0),
+    "large-table": dict(tables=2, columns=6, rows=10_000_000, fk_density=0.5, blob_size=0),
+    "blobs": dict(tables=5, columns=4, rows=100_000, fk_density=1.0, blob_size=4096),
+}
+
+COLUMN_TYPES = ("INTEGER", "TEXT", "REAL")
+EDIT_ROWS = 200  # Cells changed by the edit-save benchmark
+TIMEOUT = 600    # Seconds to wait for a background load
+
+def table_name(i):
+    return f"t{i:04d}"
+
+def column_expression(i, column_type):
+    """A deterministic value for column i of row x, spread out so indexes and filters have work to do"""
+    if column_type == "INTEGER":
+        return f"(x * {2654435761 + i}) % 1000003"
+    if column_type == "REAL":
+        return f"((x * {40503 + i}) % 100000) / 100.0"
+    return f"'value ' || ((x * {7919 + i}) % 50021)"
+
+def generate_database(path, tables, columns, rows, fk_density, blob_size):
+    """Create a database of the given shape at path, filled with INSERT ... SELECT from a recursive CTE"""
+    if os.path.exists(path):
+        os.remove(path)
+    conn = sqlite3.connect(path, isolation_level=None)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF")
+        conn.execute("PRAGMA synchronous = OFF")
+        conn.execute("BEGIN")
+        for t in range(tables):
+            # Every table references earlier ones, fk_density times on average
+            fk_count = int(fk_density * (t + 1)) - int(fk_density * t) if t else 0
+            parents = [table_name((t * 31 + k * 17) % t) for k in range(fk_count)] if t else []
+            definitions = ["id INTEGER PRIMARY KEY"]
+            values = ["x"]
+            for k, parent in enumerate(parents):
+                definitions.append(f'"{parent}_id{k}" INTEGER REFERENCES "{parent}"(id)')
+                values.append(f"1 + (x * {7919 + k}) % {rows}")
+            for i in range(columns - 1 - len(parents)):
+                column_type = COLUMN_TYPES[i % len(COLUMN_TYPES)]
+                definitions.append(f'c{i} {column_type}')
+                values.append(column_expression(i, column_type))
+            if blob_size:
+                definitions.append("payload BLOB")
+                values.append(f"zeroblob({blob_size})")
+            conn.execute(f'CREATE TABLE "{table_name(t)}" ({", ".join(definitions)})')
+            conn.execute(f"""
+                WITH RECURSIVE n(x) AS (SELECT 1 UNION ALL SELECT x + 1 FROM n WHERE x < {rows})
+                INSERT INTO "{table_name(t)}" SELECT {", ".join(values)} FROM n
+            """)
+        conn.execute("COMMIT")
+    finally:
+        conn.close()
+
+def database_path(directory, params):
+    shape = "-".join(f"{key}{value}" for key, value in sorted(params.items()))
+    return Path(directory) / f"bench-{shape}.db"
+
+def wait_until(app, condition, timeout=TIMEOUT):
+    deadline = time.perf_counter() + timeout
+    while not condition():
+        if time.perf_counter() > deadline:
+            raise TimeoutError("Benchmark step did not finish in time")
+        app.processEvents()
+        time.sleep(0.001)
+
+def timed(func):
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
+
+def bench_open(app, viewer, path):
+    def run():
+        viewer.load_database(str(path))
+        wait_until(app, lambda: viewer.catalog.tables and viewer.progress_bar.isHidden())
+    return timed(run)
+
+def bench_table_load(app, viewer, table):
+    def run():
+        viewer.page_cache.clear()  # Measure reading from SQLite, not the page cache
+        viewer.show_table_content(table)
+        wait_until(app, lambda: viewer.current_table == table
+                   and viewer.table_widget.model().rowCount() > 0)
+    viewer.current_table = None
+    return timed(run)
+
+def bench_filter(app, viewer, table, text):
+    model = viewer.table_widget.model()
+    def run():
+        viewer.page_cache.clear()
+        model.set_filter(text)
+        wait_until(app, lambda: model.rowCount() > 0 or model.at_end)
+    elapsed = timed(run)
+    model.set_filter("")
+    return elapsed
+
+def bench_edit_save(app, viewer, table, run):
+    dialog = db_viewer.EditTableDialog(viewer, viewer.current_db, table, viewer.catalog)
+    model = dialog.model
+    column = model.columnCount() - 1
+    for row in range(min(EDIT_ROWS, model.rowCount())):
+        # New values on every run, so each one has changes to save
+        model.setData(model.index(row, column), str(run * EDIT_ROWS + row + 1))
+    elapsed = timed(dialog.save_changes)
+    dialog.deleteLater()
+    return elapsed
+
+def bench_layout(viewer, layout_type):
+    _, sizes, edges = viewer.graph.layout_input()
+    engine = db_viewer.LAYOUT_ENGINES[layout_type]
+    return timed(lambda: engine.compute(sizes, edges))
+
+def bench_scene_build(app, viewer):
+    def run():
+        viewer.reset_relationship_scene()
+        viewer.visualize_relationships()
+        wait_until(app, lambda: viewer.graph.slots and viewer.layout_task is None
+                   and viewer.progress_bar.isHidden())
+        viewer.materialize_visible()
+    return timed(run)
+
+def run_benchmarks(path, repeat):
+    """Time every benchmark `repeat` times against the database at path"""
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    viewer = db_viewer.DatabaseViewer()
+    viewer.resize(1200, 800)
+    viewer.show()
+
+    results = {}
+    def record(name, seconds):
+        results.setdefault(name, []).append(seconds)
+
+    for run in range(repeat):
+        record("open", bench_open(app, viewer, path))
+        table = max(viewer.catalog.tables)  # The last generated table references others
+        record("table_load", bench_table_load(app, viewer, table))
+        record("filter", bench_filter(app, viewer, table, "value 4"))
+        record("edit_save", bench_edit_save(app, viewer, table, run))
+        for layout_type in db_viewer.LAYOUT_ENGINES:
+            record(f"layout_{layout_type.split()[0].lower()}", bench_layout(viewer, layout_type))
+        record("scene_build", bench_scene_build(app, viewer))
+    viewer.close()
+
+    return {name: {'seconds': times, 'median': statistics.median(times), 'min': min(times)}
+            for name, times in results.items()}
+
+def compare(results, baseline):
+    """Print how much faster or slower each benchmark got against an earlier run"""
+    for name, result in results.items():
+        before = baseline['results'].get(name)
+        if before:
+            ratio = result['median'] / before['median'] if before['median'] else float('inf')
+            print(f"{name:<20} {before['median'] * 1000:10.1f} ms -> "
+                  f"{result['median'] * 1000:10.1f} ms  ({ratio:.2f}x)", file=sys.stderr)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark SpaceDB Viewer on synthetic databases.")
+    parser.add_argument("--scale", choices=SCALES, default="small",
+                        help="Preset database shape; the options below override it")
+    parser.add_argument("--tables", type=int)
+    parser.add_argument("--columns", type=int, help="Columns per table, including id and foreign keys")
+    parser.add_argument("--rows", type=int, help="Rows per table")
+    parser.add_argument("--fk-density", type=float, help="Foreign keys per table on average")
+    parser.add_argument("--blob-size", type=int, help="Bytes in an extra BLOB column (0 for none)")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--data-dir", default=".benchmarks", help="Where generated databases are kept")
+    parser.add_argument("--regenerate", action="store_true", help="Generate the database even if it exists")
+    parser.add_argument("--output", help="Write the JSON results here instead of stdout")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare against")
+    args = parser.parse_args(argv)
+
+    params = dict(SCALES[args.scale])
+    for key in params:
+        value = getattr(args, key)
+        if value is not None:
+            params[key] = value
+
+    os.makedirs(args.data_dir, exist_ok=True)
+    path = database_path(args.data_dir, params)
+    generation = None
+    if args.regenerate or not path.exists():
+        print(f"Generating {path}...", file=sys.stderr)
+        generation = timed(lambda: generate_database(path, **params))
+
+    report = {
+        'scale': args.scale,
+        'params': params,
+        'database_bytes': path.stat().st_size,
+        'generation_seconds': generation,
+        'python': platform.python_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'results': run_benchmarks(path, args.repeat),
+    }
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n", encoding="utf-8")
+    else:
+        print(text)
+    if args.compare:
+        compare(report['results'], json.loads(Path(args.compare).read_text(encoding="utf-8")))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,17 +1,156 @@
+import os
 import sys
+import re
+import csv
+import html
+import json
+import argparse
 import sqlite3
+import tempfile
+import time
+import inspect
+import itertools
+import threading
+import functools
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from pathlib import Path
 from PyQt6.QtWidgets import (QApplication, QMainWindow, QWidget, QVBoxLayout, 
                             QHBoxLayout, QPushButton, QLabel, QFileDialog, 
-                            QTableWidget, QTableWidgetItem, QTabWidget,
+                            QTableView, QTabWidget,
                             QGraphicsScene, QGraphicsView, QGraphicsItem,
                             QGraphicsRectItem, QGraphicsTextItem, QMenu,
                             QComboBox, QHeaderView, QToolTip, QStyledItemDelegate,
                             QStyle, QLineEdit, QDialog, QFormLayout, QSpinBox,
-                            QCheckBox, QMessageBox, QScrollArea)
-from PyQt6.QtCore import Qt, QRectF, QPointF
+                            QCheckBox, QMessageBox, QScrollArea, QProgressBar,
+                            QStyleOptionGraphicsItem, QSplitter, QPlainTextEdit,
+                            QTreeWidget, QTreeWidgetItem)
+from PyQt6.QtCore import (Qt, QRectF, QPointF, QSize, QAbstractTableModel, QModelIndex,
+                          QObject, QRunnable, QThreadPool, QTimer, pyqtSignal)
 from PyQt6.QtGui import (QPen, QBrush, QColor, QPainter, QFont, QCursor,
-                        QPainterPath, QPolygonF, QWheelEvent, QPalette)
+                        QPainterPath, QPolygonF, QWheelEvent, QPalette, QPixmap,
+                        QTransform, QImage, QShortcut, QKeySequence)
+from PyQt6.QtSvg import QSvgGenerator
 import math
+import numpy as np
+import networkx as nx
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet export is only offered when pyarrow is installed
+    pa = None
+
+class Profiler:
+    """Timing spans and SQL statements for the profiler pane and Chrome trace export.
+
+    Spans are stored as complete events of the Trace Event Format, so an
+    exported file opens in chrome://tracing or Perfetto. Statements come from
+    the trace callback of instrumented connections. Inside a span each one
+    lasts until the next statement on the same thread or the end of the
+    span, and the progress handler counts the virtual machine steps it took.
+    Statements outside any span are recorded as instant events, since
+    nothing marks when the caller is done with them. While disabled, spans
+    and callbacks return right away. Safe to use from any thread.
+    """
+    MAX_EVENTS = 100000
+    PROGRESS_STEPS = 10000  # VM instructions between progress callbacks
+    
+    def __init__(self):
+        self.enabled = False
+        self.recorded = 0  # Events recorded since the last clear, including dropped ones
+        self._events = deque(maxlen=self.MAX_EVENTS)
+        self._origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        
+    def clear(self):
+        with self._lock:
+            self._events.clear()
+            self.recorded = 0
+            
+    @contextmanager
+    def span(self, name, category, **args):
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        self._local.depth = getattr(self._local, 'depth', 0) + 1
+        try:
+            yield
+        finally:
+            self._local.depth -= 1
+            self._end_statement()
+            self._record(name, category, start, time.perf_counter(), args)
+            
+    def profiled(self, category):
+        """Decorator recording every call of a function as a span"""
+        def decorate(func):
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with self.span(func.__qualname__, category):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorate
+        
+    def instrument(self, conn):
+        conn.set_trace_callback(self._on_statement)
+        conn.set_progress_handler(self._on_progress, self.PROGRESS_STEPS)
+        return conn
+        
+    def _on_statement(self, sql):
+        # Statements run inside another one (triggers, pragma tables) are traced as comments
+        if not self.enabled or sql.startswith("--"):
+            return
+        self._end_statement()
+        if getattr(self._local, 'depth', 0):
+            self._local.statement = [sql, time.perf_counter(), 0]
+        else:
+            self._record(" ".join(sql.split())[:80], "sql", time.perf_counter(), None,
+                         {'sql': sql[:2000]})
+            
+    def _on_progress(self):
+        statement = getattr(self._local, 'statement', None)
+        if statement is not None:
+            statement[2] += self.PROGRESS_STEPS
+        return 0  # Anything else would abort the statement
+        
+    def _end_statement(self):
+        statement = getattr(self._local, 'statement', None)
+        if statement is not None:
+            self._local.statement = None
+            sql, start, steps = statement
+            self._record(" ".join(sql.split())[:80], "sql", start, time.perf_counter(),
+                         {'sql': sql[:2000], 'vm_steps': steps})
+            
+    def _record(self, name, category, start, end, args):
+        """Record a complete event, or an instant event when end is None"""
+        event = {
+            'name': name, 'cat': category, 'ph': 'X',
+            'ts': (start - self._origin) * 1e6,
+            'pid': os.getpid(), 'tid': threading.get_ident(), 'args': args,
+        }
+        if end is None:
+            event.update(ph='i', s='t')
+        else:
+            event['dur'] = (end - start) * 1e6
+        with self._lock:
+            self._events.append(event)
+            self.recorded += 1
+            
+    def events_since(self, recorded):
+        """Events recorded after the given count of recorded events, and the new count"""
+        with self._lock:
+            new = min(self.recorded - recorded, len(self._events))
+            return list(itertools.islice(self._events, len(self._events) - new, None)), self.recorded
+            
+    def write_chrome_trace(self, path):
+        with self._lock:
+            events = list(self._events)
+        with open(path, "w", encoding="utf-8") as out:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms'}, out)
+            
+PROFILER = Profiler()
 
 # Modern Color Scheme
 class Colors:
@@ -86,17 +225,62 @@ class ModernButton(QPushButton):
         """)
 
 class TableCard(QGraphicsItem):
+    # Below these levels of detail the card drops its column rows, then everything but a block
+    LOD_HEADER_ONLY = 0.5
+    LOD_BLOCK = 0.2
+    
+    WIDTH = 240  # Slightly wider for better readability
+    HEADER_HEIGHT = 40
+    ROW_HEIGHT = 28  # Slightly taller rows
+    
+    _styles = None
+    
+    @classmethod
+    def styles(cls):
+        """Pens, brushes and fonts shared by every card, created on first paint"""
+        if cls._styles is None:
+            cls._styles = {
+                'shadow_brush': QBrush(QColor(0, 0, 0, 50)),
+                'card_brush': QBrush(QColor(Colors.CARD_BACKGROUND)),
+                'border_pen': QPen(QColor(Colors.PRIMARY), 2),
+                'header_brush': QBrush(QColor(Colors.PRIMARY)),
+                'pk_brush': QBrush(QColor(Colors.PK_BACKGROUND)),
+                'fk_brush': QBrush(QColor(Colors.FK_BACKGROUND)),
+                'title_pen': QPen(QColor(Colors.TEXT_PRIMARY)),
+                'text_pen': QPen(QColor(Colors.TEXT_SECONDARY)),
+                'pk_pen': QPen(QColor(Colors.PK_COLOR)),
+                'fk_pen': QPen(QColor(Colors.FK_COLOR)),
+                'grid_pen': QPen(QColor(Colors.GRID_LINE)),
+                'title_font': QFont("Segoe UI", 10, QFont.Weight.Bold),
+                'column_font': QFont("Segoe UI", 9),
+            }
+        return cls._styles
+    
     def __init__(self, table_name, columns, parent=None):
         super().__init__(parent)
         self.table_name = table_name
         self.columns = columns
-        self.width = 240  # Slightly wider for better readability
-        self.header_height = 40
-        self.row_height = 28  # Slightly taller rows
+        self.width = self.WIDTH
+        self.header_height = self.HEADER_HEIGHT
+        self.row_height = self.ROW_HEIGHT
         self.height = self.header_height + len(columns) * self.row_height
+        self.slot = None  # CardSlot this card was materialized from
+        self._press_pos = None
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemIsMovable)
         self.setFlag(QGraphicsItem.GraphicsItemFlag.ItemSendsGeometryChanges)
         self.setAcceptHoverEvents(True)
+        # Cards only change when moved, so reuse their rendering while panning
+        self.setCacheMode(QGraphicsItem.CacheMode.DeviceCoordinateCache)
+        
+        # Column labels with type and relationship indicators
+        self.column_texts = []
+        for column in columns:
+            col_text = f"{column['name']} ({column['type']})"
+            if column['pk']:
+                col_text = f"🔑 {col_text}"
+            elif column['fk']:
+                col_text = f"🔗 {col_text}"
+            self.column_texts.append(col_text)
         
         # Store connections
         self.connections = []
@@ -105,65 +289,69 @@ class TableCard(QGraphicsItem):
         return QRectF(0, 0, self.width, self.height)
         
     def paint(self, painter, option, widget):
-        # Draw card shadow
-        shadow_rect = self.boundingRect().adjusted(2, 2, 2, 2)
-        painter.setBrush(QBrush(QColor(0, 0, 0, 50)))
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawRoundedRect(shadow_rect, 10, 10)
+        styles = self.styles()
+        lod = option.levelOfDetailFromTransform(painter.worldTransform())
+        
+        if lod < self.LOD_BLOCK:
+            # Zoomed far out: a plain block is all that can be seen
+            painter.fillRect(self.boundingRect(), styles['header_brush'])
+            return
+        
+        if lod >= self.LOD_HEADER_ONLY:
+            # Draw card shadow
+            shadow_rect = self.boundingRect().adjusted(2, 2, 2, 2)
+            painter.setBrush(styles['shadow_brush'])
+            painter.setPen(Qt.PenStyle.NoPen)
+            painter.drawRoundedRect(shadow_rect, 10, 10)
         
         # Draw card background
-        painter.setBrush(QBrush(QColor(Colors.CARD_BACKGROUND)))
-        painter.setPen(QPen(QColor(Colors.PRIMARY), 2))
+        painter.setBrush(styles['card_brush'])
+        painter.setPen(styles['border_pen'])
         painter.drawRoundedRect(0, 0, self.width, self.height, 10, 10)
         
         # Draw header
         header_rect = QRectF(0, 0, self.width, self.header_height)
-        painter.setBrush(QBrush(QColor(Colors.PRIMARY)))
+        painter.setBrush(styles['header_brush'])
         painter.setPen(Qt.PenStyle.NoPen)
         painter.drawRoundedRect(header_rect, 10, 10)
         
         # Draw table name
-        painter.setPen(QPen(QColor(Colors.TEXT_PRIMARY)))
-        font = QFont("Segoe UI", 10, QFont.Weight.Bold)
-        painter.setFont(font)
+        painter.setPen(styles['title_pen'])
+        painter.setFont(styles['title_font'])
         text_rect = QRectF(10, 0, self.width - 20, self.header_height)
         painter.drawText(text_rect, Qt.AlignmentFlag.AlignVCenter, self.table_name)
         
+        if lod < self.LOD_HEADER_ONLY:
+            return
+        
         # Draw columns
-        painter.setPen(QPen(QColor(Colors.TEXT_SECONDARY)))
-        font = QFont("Segoe UI", 9)
-        painter.setFont(font)
+        painter.setFont(styles['column_font'])
         
         for i, column in enumerate(self.columns):
             y = self.header_height + i * self.row_height
             name_rect = QRectF(10, y, self.width - 20, self.row_height)
             
-            # Create column text with type
-            col_text = f"{column['name']} ({column['type']})"
-            
             # Add relationship indicators with custom styling
             if column['pk']:
                 pk_rect = QRectF(8, y + 4, self.width - 16, self.row_height - 8)
-                painter.setBrush(QBrush(QColor(Colors.PK_BACKGROUND)))
+                painter.setBrush(styles['pk_brush'])
                 painter.setPen(Qt.PenStyle.NoPen)
                 painter.drawRoundedRect(pk_rect, 4, 4)
-                painter.setPen(QPen(QColor(Colors.PK_COLOR)))
-                col_text = f"🔑 {col_text}"
+                painter.setPen(styles['pk_pen'])
             elif column['fk']:
                 fk_rect = QRectF(8, y + 4, self.width - 16, self.row_height - 8)
-                painter.setBrush(QBrush(QColor(Colors.FK_BACKGROUND)))
+                painter.setBrush(styles['fk_brush'])
                 painter.setPen(Qt.PenStyle.NoPen)
                 painter.drawRoundedRect(fk_rect, 4, 4)
-                painter.setPen(QPen(QColor(Colors.FK_COLOR)))
-                col_text = f"🔗 {col_text}"
+                painter.setPen(styles['fk_pen'])
             else:
-                painter.setPen(QPen(QColor(Colors.TEXT_SECONDARY)))
+                painter.setPen(styles['text_pen'])
             
-            painter.drawText(name_rect, Qt.AlignmentFlag.AlignVCenter, col_text)
+            painter.drawText(name_rect, Qt.AlignmentFlag.AlignVCenter, self.column_texts[i])
             
             # Draw separator line
             if i < len(self.columns) - 1:
-                painter.setPen(QPen(QColor(Colors.GRID_LINE)))
+                painter.setPen(styles['grid_pen'])
                 painter.drawLine(10, y + self.row_height, self.width - 10, y + self.row_height)
 
     def mousePressEvent(self, event):
@@ -171,15 +359,44 @@ class TableCard(QGraphicsItem):
             menu = QMenu()
             menu.addAction("View Data", lambda: self.scene().parent().show_table_data(self.table_name))
             menu.exec(QCursor.pos())
+        self._press_pos = self.pos()
         super().mousePressEvent(event)
         
+    def mouseReleaseEvent(self, event):
+        super().mouseReleaseEvent(event)
+        if self.pos() != self._press_pos:
+            for view in self.scene().views():
+                view.cards_moved.emit()
+        
     def itemChange(self, change, value):
-        if change == QGraphicsItem.GraphicsItemChange.ItemPositionChange:
+        # Only the connectors attached to this card need new geometry
+        if change == QGraphicsItem.GraphicsItemChange.ItemPositionHasChanged:
+            if self.slot is not None:
+                self.slot.x, self.slot.y = value.x(), value.y()
             for conn in self.connections:
                 conn.updatePosition()
         return super().itemChange(change, value)
 
 class Connector(QGraphicsItem):
+    # Below this level of detail connectors are drawn as plain straight lines
+    LOD_SIMPLE = 0.4
+    
+    _styles = None
+    
+    @classmethod
+    def styles(cls):
+        """Pens and brushes shared by every connector, created on first paint"""
+        if cls._styles is None:
+            line_pen = QPen(QColor("#2196F3"), 2, Qt.PenStyle.DashLine)
+            simple_pen = QPen(QColor("#2196F3"), 1)
+            simple_pen.setCosmetic(True)  # One pixel wide whatever the zoom
+            cls._styles = {
+                'line_pen': line_pen,
+                'simple_pen': simple_pen,
+                'arrow_brush': QBrush(QColor("#2196F3")),
+            }
+        return cls._styles
+    
     def __init__(self, start_card, end_card, start_column, end_column, parent=None):
         super().__init__(parent)
         self.start_card = start_card
@@ -188,11 +405,26 @@ class Connector(QGraphicsItem):
         self.end_column = end_column
         self.start_card.connections.append(self)
         self.end_card.connections.append(self)
+        self.calculateLine()
+        
+    def detach(self):
+        """Unregister from both endpoints before the connector is removed"""
+        for card in (self.start_card, self.end_card):
+            card.connections[:] = [conn for conn in card.connections if conn is not self]
+                
+    def replace_endpoint(self, old, new):
+        """Anchor to a freshly materialized card instead of its placeholder"""
+        if self.start_card is old:
+            self.start_card = new
+        if self.end_card is old:
+            self.end_card = new
+        self.updatePosition()
         
     def boundingRect(self):
-        return self.calculateLine()
+        return self._rect
         
     def calculateLine(self):
+        """Compute and cache the curve, arrow head and bounding rect"""
         start_pos = self.start_card.pos()
         end_pos = self.end_card.pos()
         
@@ -203,24 +435,8 @@ class Connector(QGraphicsItem):
         end_x = end_pos.x()
         end_y = end_pos.y() + self.end_card.header_height + self.end_column * self.end_card.row_height + self.end_card.row_height/2
         
-        # Return bounding rectangle that encompasses the line
-        x = min(start_x, end_x)
-        y = min(start_y, end_y)
-        width = abs(end_x - start_x)
-        height = abs(end_y - start_y)
-        
-        return QRectF(x-5, y-5, width+10, height+10)
-        
-    def paint(self, painter, option, widget):
-        rect = self.calculateLine()
-        start_x = self.start_card.pos().x() + self.start_card.width
-        start_y = self.start_card.pos().y() + self.start_card.header_height + self.start_column * self.start_card.row_height + self.start_card.row_height/2
-        
-        end_x = self.end_card.pos().x()
-        end_y = self.end_card.pos().y() + self.end_card.header_height + self.end_column * self.end_card.row_height + self.end_card.row_height/2
-        
-        # Draw connection line
-        painter.setPen(QPen(QColor("#2196F3"), 2, Qt.PenStyle.DashLine))
+        self._start = QPointF(start_x, start_y)
+        self._end = QPointF(end_x, end_y)
         
         # Calculate control points for curved line
         ctrl1_x = start_x + (end_x - start_x) * 0.4
@@ -228,32 +444,403 @@ class Connector(QGraphicsItem):
         ctrl2_x = start_x + (end_x - start_x) * 0.6
         ctrl2_y = end_y
         
-        # Draw curved line
-        path = QPainterPath()
-        path.moveTo(start_x, start_y)
-        path.cubicTo(ctrl1_x, ctrl1_y, ctrl2_x, ctrl2_y, end_x, end_y)
-        painter.drawPath(path)
+        self._path = QPainterPath()
+        self._path.moveTo(start_x, start_y)
+        self._path.cubicTo(ctrl1_x, ctrl1_y, ctrl2_x, ctrl2_y, end_x, end_y)
         
-        # Draw arrow at end
+        # Arrow at end
         arrow_size = 10
         angle = math.atan2(end_y - ctrl2_y, end_x - ctrl2_x)
         arrow_p1 = QPointF(end_x - arrow_size * math.cos(angle - math.pi/6),
                           end_y - arrow_size * math.sin(angle - math.pi/6))
         arrow_p2 = QPointF(end_x - arrow_size * math.cos(angle + math.pi/6),
                           end_y - arrow_size * math.sin(angle + math.pi/6))
+        self._arrow = QPolygonF([self._end, arrow_p1, arrow_p2])
         
-        painter.setBrush(QBrush(QColor("#2196F3")))
-        arrow = QPolygonF([QPointF(end_x, end_y), arrow_p1, arrow_p2])
-        painter.drawPolygon(arrow)
+        # Bounding rectangle that encompasses the line, the arrow and the pen
+        self._rect = self._path.boundingRect().united(self._arrow.boundingRect()).adjusted(-5, -5, 5, 5)
+        return self._rect
+        
+    def paint(self, painter, option, widget):
+        styles = self.styles()
+        if option.levelOfDetailFromTransform(painter.worldTransform()) < self.LOD_SIMPLE:
+            painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+            painter.setPen(styles['simple_pen'])
+            painter.drawLine(self._start, self._end)
+            return
+        
+        # Draw curved connection line
+        painter.setPen(styles['line_pen'])
+        painter.drawPath(self._path)
+        
+        # Draw arrow at end
+        painter.setBrush(styles['arrow_brush'])
+        painter.drawPolygon(self._arrow)
         
     def updatePosition(self):
+        """Called by the cards after one of them moved"""
         self.prepareGeometryChange()
+        self.calculateLine()
+
+class CardSlot:
+    """Placeholder for a table card with its position and size but no graphics item"""
+    
+    def __init__(self, table_name, columns):
+        self.table_name = table_name
+        self.columns = columns
+        self.column_index = {col['name']: i for i, col in enumerate(columns)}
+        self.width = TableCard.WIDTH
+        self.header_height = TableCard.HEADER_HEIGHT
+        self.row_height = TableCard.ROW_HEIGHT
+        self.height = self.header_height + len(columns) * self.row_height
+        self.x = self.y = 0.0
+        self.placed = False  # Whether a layout has given the slot a position
+        self.card = None  # TableCard once the slot comes near the viewport
+        self.connections = []  # Shared with the card, so connectors survive materializing
+        
+    def pos(self):
+        return QPointF(self.x, self.y)
+        
+    def rect(self):
+        return QRectF(self.x, self.y, self.width, self.height)
+        
+    def setPos(self, x, y):
+        self.x, self.y = x, y
+        self.placed = True
+        if self.card is not None:
+            self.card.setPos(x, y)  # Updates the connectors through itemChange
+        else:
+            for conn in self.connections:
+                conn.updatePosition()
+                
+    def anchor(self):
+        """What connectors attach to: the card if there is one, else the slot itself"""
+        return self.card if self.card is not None else self
+
+class SchemaGraph:
+    """Tables and foreign keys of the relationship diagram, kept apart from the scene"""
+    
+    def __init__(self):
+        self.schema_version = None
+        self.slots = {}  # table name -> CardSlot
+        self.edges = {}  # (table, column index, parent, parent column index) -> (slot, parent slot)
+        self.edges_by_table = {}
+        
+    def sync(self, catalog):
+        """Update to the catalog's schema and return what changed
+        
+        Tables whose columns are unchanged keep their slot, position and card.
+        Returns (removed slots, added slots, removed edge keys, added edge keys).
+        """
+        slots = {}
+        for table in catalog.tables:
+            columns = catalog.table_columns(table)
+            old = self.slots.get(table)
+            if old is not None and old.columns == columns:
+                slots[table] = old
+                continue
+            slots[table] = CardSlot(table, columns)
+            if old is not None:
+                # A changed table keeps its place in the diagram
+                slots[table].x, slots[table].y, slots[table].placed = old.x, old.y, old.placed
+        
+        edges = {}
+        for table, slot in slots.items():
+            for i, column in enumerate(slot.columns):
+                if not column['fk']:
+                    continue
+                ref = column['fk_ref']
+                parent = slots.get(ref['table'])
+                if parent is None or ref['column'] not in parent.column_index:
+                    continue
+                edges[(table, i, ref['table'], parent.column_index[ref['column']])] = (slot, parent)
+        
+        removed_slots = [slot for table, slot in self.slots.items() if slots.get(table) is not slot]
+        added_slots = [slot for table, slot in slots.items() if self.slots.get(table) is not slot]
+        removed_edges = [key for key, value in self.edges.items() if edges.get(key) != value]
+        added_edges = [key for key, value in edges.items() if self.edges.get(key) != value]
+        
+        self.slots = slots
+        self.edges = edges
+        self.edges_by_table = {table: [] for table in slots}
+        for key in edges:
+            self.edges_by_table[key[0]].append(key)
+            if key[2] != key[0]:
+                self.edges_by_table[key[2]].append(key)
+        self.schema_version = catalog.schema_version
+        return removed_slots, added_slots, removed_edges, added_edges
+        
+    def layout_input(self):
+        """Slots, their sizes and edges as slot index pairs, as the layout engines take them"""
+        slots = list(self.slots.values())
+        index = {slot.table_name: i for i, slot in enumerate(slots)}
+        sizes = [(slot.width, slot.height) for slot in slots]
+        edges = [(index[child], index[parent]) for child, _, parent, _ in self.edges]
+        return slots, sizes, edges
+        
+    def bounding_rect(self):
+        rect = QRectF()
+        for slot in self.slots.values():
+            rect = rect.united(slot.rect())
+        return rect
+
+def spring_layout(sizes, edges, iterations=50, k=300, seed=None):
+    """Force-directed (Fruchterman-Reingold) layout computed with NumPy arrays.
+
+    sizes is an (n, 2) array of card widths and heights and edges a list of
+    (i, j) index pairs. Returns an (n, 2) array of top-left positions.
+    Cards only repel others within 2*k, the usual grid variant of the
+    algorithm; large graphs find those neighbours through grid buckets
+    instead of comparing every pair.
+    """
+    sizes = np.asarray(sizes, dtype=float).reshape(-1, 2)
+    n = len(sizes)
+    if n == 0:
+        return np.zeros((0, 2))
+
+    rng = np.random.default_rng(seed)
+    extent = k * math.sqrt(n)
+    pos = rng.uniform(0, extent, size=(n, 2))
+    edges = np.asarray(edges, dtype=int).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+
+    # The largest step shrinks every iteration so the layout settles
+    temperature = extent / 10
+    cooling = temperature / (iterations + 1)
+
+    for _ in range(iterations):
+        if n <= SPRING_EXACT_LIMIT:
+            disp = _repulsion(pos, pos, k)
+        else:
+            disp = _bucketed_repulsion(pos, k)
+
+        # Attraction along edges
+        if len(edges):
+            delta = pos[edges[:, 0]] - pos[edges[:, 1]]
+            dist = np.maximum(np.hypot(delta[:, 0], delta[:, 1]), 1.0)
+            force = delta * (dist / k)[:, None]  # d^2 / k along the unit vector
+            np.subtract.at(disp, edges[:, 0], force)
+            np.add.at(disp, edges[:, 1], force)
+
+        # Limit each move to the current temperature
+        length = np.maximum(np.hypot(disp[:, 0], disp[:, 1]), 1e-9)
+        pos += disp * (np.minimum(length, temperature) / length)[:, None]
+        temperature -= cooling
+
+    # Convert centres to top-left corners
+    pos -= sizes / 2
+    return pos - pos.min(axis=0) + 50
+
+SPRING_EXACT_LIMIT = 400
+
+def _repulsion(pos, other, k):
+    """Repulsion on pos from the cards at other closer than 2*k.
+
+    The sums over (p - o) * strength are taken as p * sum(strength) -
+    strength @ o, so the pairwise work is matrix products. A card's offset
+    from itself is zero, so it needs no masking out.
+    """
+    dist2 = ((pos * pos).sum(axis=1)[:, None] + (other * other).sum(axis=1)[None, :]
+             - 2 * pos @ other.T)
+    # k^2 / d along the unit vector is k^2 * delta / d^2
+    strength = (k * k) / np.maximum(dist2, 1.0)
+    strength[dist2 >= 4 * k * k] = 0.0
+    return pos * strength.sum(axis=1)[:, None] - strength @ other
+
+def _bucketed_repulsion(pos, k):
+    cells = np.floor(pos / (2 * k)).astype(np.int64)
+    order = np.lexsort((cells[:, 1], cells[:, 0]))
+    unique, starts, counts = np.unique(cells[order], axis=0, return_index=True, return_counts=True)
+    buckets = {(int(cx), int(cy)): order[start:start + count]
+               for (cx, cy), start, count in zip(unique, starts, counts)}
+
+    disp = np.zeros_like(pos)
+    for (cx, cy), members in buckets.items():
+        neighbours = np.concatenate([buckets[(cx + dx, cy + dy)]
+                                     for dx in (-1, 0, 1) for dy in (-1, 0, 1)
+                                     if (cx + dx, cy + dy) in buckets])
+        disp[members] = _repulsion(pos[members], pos[neighbours], k)
+    return disp
+
+class LayoutEngine:
+    """Computes card positions for the relationship graph.
+
+    compute() receives an (n, 2) array of card widths and heights and the
+    foreign key edges as (child, parent) index pairs, and returns an (n, 2)
+    array of top-left positions. Engines never touch Qt objects, so layouts
+    can run on a worker thread.
+    """
+    name = None
+    gap = 60
+
+    def compute(self, sizes, edges):
+        raise NotImplementedError
+
+class GridLayoutEngine(LayoutEngine):
+    name = "Grid Layout"
+
+    def compute(self, sizes, edges):
+        sizes = np.asarray(sizes, dtype=float).reshape(-1, 2)
+        positions = np.zeros_like(sizes)
+        if not len(sizes):
+            return positions
+        cols = int(math.sqrt(len(sizes))) + 1
+        col_width = sizes[:, 0].max() + self.gap
+        y = 50
+        for start in range(0, len(sizes), cols):
+            row = slice(start, start + cols)
+            positions[row, 0] = np.arange(len(sizes[row])) * col_width + 50
+            positions[row, 1] = y
+            # Each row is as tall as its tallest card
+            y += sizes[row, 1].max() + self.gap
+        return positions
+
+class CircularLayoutEngine(LayoutEngine):
+    name = "Circular Layout"
+
+    def compute(self, sizes, edges):
+        sizes = np.asarray(sizes, dtype=float).reshape(-1, 2)
+        if not len(sizes):
+            return np.zeros((0, 2))
+        # Make the circle long enough to fit every card side by side
+        radius = max(300, len(sizes) * (sizes[:, 0].max() + self.gap) / (2 * math.pi))
+        centres = np.array(list(nx.circular_layout(range(len(sizes)), scale=radius).values()))
+        positions = centres - sizes / 2
+        return positions - positions.min(axis=0) + 50
+
+class SpringLayoutEngine(LayoutEngine):
+    name = "Spring Layout"
+
+    def compute(self, sizes, edges):
+        return pack_components(sizes, edges, spring_layout, gap=self.gap)
+
+class LayeredLayoutEngine(LayoutEngine):
+    """Sugiyama-style layout with referenced tables above the tables referencing them.
+
+    Foreign key cycles are collapsed with networkx's condensation, layers
+    come from its topological generations, and the order inside each layer
+    is refined with barycenter sweeps to reduce edge crossings. Layers are
+    spaced by the height of their tallest card.
+    """
+    name = "Layered Layout"
+    sweeps = 4
+
+    def compute(self, sizes, edges):
+        return pack_components(sizes, edges, self.layout_component, gap=self.gap)
+
+    def layout_component(self, sizes, edges):
+        graph = nx.DiGraph()
+        graph.add_nodes_from(range(len(sizes)))
+        graph.add_edges_from((parent, child) for child, parent in edges if child != parent)
+        dag = nx.condensation(graph)
+        members = nx.get_node_attributes(dag, 'members')
+
+        layer_of = {}
+        for depth, generation in enumerate(nx.topological_generations(dag)):
+            for scc in generation:
+                for node in members[scc]:
+                    layer_of[node] = depth
+        layers = [[] for _ in range(max(layer_of.values()) + 1)]
+        for node in sorted(layer_of):
+            layers[layer_of[node]].append(node)
+
+        # Barycenter sweeps, alternating downwards and upwards
+        neighbours = {node: set(graph.predecessors(node)) | set(graph.successors(node))
+                      for node in graph}
+        for sweep in range(self.sweeps):
+            order = range(1, len(layers)) if sweep % 2 == 0 else range(len(layers) - 2, -1, -1)
+            for i in order:
+                fixed = layers[i - 1] if sweep % 2 == 0 else layers[i + 1]
+                rank = {node: r for r, node in enumerate(fixed)}
+                current = {node: r for r, node in enumerate(layers[i])}
+
+                def barycenter(node):
+                    # Nodes without neighbours in the fixed layer keep their place
+                    ranks = [rank[n] for n in neighbours[node] if n in rank]
+                    return sum(ranks) / len(ranks) if ranks else current[node]
+
+                layers[i] = sorted(layers[i], key=barycenter)
+
+        positions = np.zeros((len(sizes), 2))
+        widths = [sum(sizes[node][0] for node in layer) + self.gap * (len(layer) - 1)
+                  for layer in layers]
+        widest = max(widths)
+        y = 0
+        for layer, width in zip(layers, widths):
+            x = (widest - width) / 2  # Centre each layer
+            for node in layer:
+                positions[node] = (x, y)
+                x += sizes[node][0] + self.gap
+            y += max(sizes[node][1] for node in layer) + self.gap * 2
+        return positions
+
+def pack_components(sizes, edges, layout, gap=60):
+    """Lay out each connected component separately and pack them in rows.
+
+    layout(sizes, edges) is called per component with local indices, except
+    for tables on their own, which need no layout. Components are placed
+    largest first on shelves roughly as wide as the square root of their
+    total area, so isolated tables end up in a grid after the rest.
+    """
+    sizes = np.asarray(sizes, dtype=float).reshape(-1, 2)
+    positions = np.zeros_like(sizes)
+    if not len(sizes):
+        return positions
+
+    graph = nx.Graph()
+    graph.add_nodes_from(range(len(sizes)))
+    graph.add_edges_from(edges)
+
+    components = [sorted(component) for component in nx.connected_components(graph)]
+    component_of = {node: c for c, nodes in enumerate(components) for node in nodes}
+    component_edges = [[] for _ in components]
+    for a, b in edges:
+        component_edges[component_of[a]].append((a, b))
+
+    boxes = []
+    for nodes, component in zip(components, component_edges):
+        if len(nodes) == 1:
+            local_positions = np.zeros((1, 2))
+        else:
+            local = {node: i for i, node in enumerate(nodes)}
+            local_edges = [(local[a], local[b]) for a, b in component]
+            local_positions = np.asarray(layout(sizes[nodes], local_edges), dtype=float)
+            local_positions -= local_positions.min(axis=0)
+        extent = (local_positions + sizes[nodes]).max(axis=0)
+        boxes.append((nodes, local_positions, extent))
+
+    boxes.sort(key=lambda box: (box[2][1], box[2][0]), reverse=True)
+    shelf_width = max(math.sqrt(sum(w * h for _, _, (w, h) in boxes)) * 1.5,
+                      max(w for _, _, (w, _) in boxes))
+    x = y = shelf_height = 0
+    for nodes, local_positions, (w, h) in boxes:
+        if x > 0 and x + w > shelf_width:
+            x = 0
+            y += shelf_height + gap
+            shelf_height = 0
+        positions[nodes] = local_positions + (x + 50, y + 50)
+        x += w + gap
+        shelf_height = max(shelf_height, h)
+    return positions
+
+LAYOUT_ENGINES = {engine.name: engine for engine in (
+    GridLayoutEngine(),
+    CircularLayoutEngine(),
+    SpringLayoutEngine(),
+    LayeredLayoutEngine(),
+)}
 
 class EnhancedGraphicsView(QGraphicsView):
+    # Emitted when the visible part of the scene may have changed
+    viewport_changed = pyqtSignal()
+    # Emitted when the user finished dragging cards to new positions
+    cards_moved = pyqtSignal()
+    
     def __init__(self, scene, parent=None):
         super().__init__(scene, parent)
         self.setRenderHint(QPainter.RenderHint.Antialiasing)
-        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.FullViewportUpdate)
+        # Repaint only the regions of items that changed, e.g. a dragged card and its connectors
+        self.setViewportUpdateMode(QGraphicsView.ViewportUpdateMode.MinimalViewportUpdate)
         self.setHorizontalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
         self.setVerticalScrollBarPolicy(Qt.ScrollBarPolicy.ScrollBarAlwaysOn)
         self.setDragMode(QGraphicsView.DragMode.RubberBandDrag)
@@ -264,6 +851,44 @@ class EnhancedGraphicsView(QGraphicsView):
         self._panning = False
         self._last_mouse_pos = None
         
+        # Tables without a card yet are drawn as plain blocks from this graph
+        self.graph = None
+        self._placeholder_brush = QBrush(QColor(Colors.PRIMARY))
+        self._placeholder_pen = QPen(QColor("#2196F3"), 1)
+        self._placeholder_pen.setCosmetic(True)
+        
+    @PROFILER.profiled("paint")
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        
+    def drawBackground(self, painter, rect):
+        super().drawBackground(painter, rect)
+        if self.graph is None:
+            return
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing, False)
+        painter.setPen(self._placeholder_pen)
+        for slot, parent in self.graph.edges.values():
+            if slot.card is None and parent.card is None:
+                line_rect = QRectF(slot.pos(), parent.pos()).normalized().adjusted(-1, -1, slot.width + 1, parent.height + 1)
+                if rect.intersects(line_rect):
+                    painter.drawLine(QPointF(slot.x + slot.width, slot.y + slot.header_height / 2),
+                                     QPointF(parent.x, parent.y + parent.header_height / 2))
+        for slot in self.graph.slots.values():
+            if slot.card is None and slot.placed and rect.intersects(slot.rect()):
+                painter.fillRect(slot.rect(), self._placeholder_brush)
+        
+    def scale(self, sx, sy):
+        super().scale(sx, sy)
+        self.viewport_changed.emit()
+        
+    def scrollContentsBy(self, dx, dy):
+        super().scrollContentsBy(dx, dy)
+        self.viewport_changed.emit()
+        
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.viewport_changed.emit()
+        
     def wheelEvent(self, event: QWheelEvent):
         # Zoom Factor
         zoom_factor = 1.15
@@ -314,6 +939,86 @@ class EnhancedGraphicsView(QGraphicsView):
         else:
             super().mouseMoveEvent(event)
 
+class MinimapWidget(QWidget):
+    """Overview of the whole diagram drawn from the slot positions; click or drag to move the view"""
+    
+    MARGIN = 6
+    
+    def __init__(self, view, parent=None):
+        super().__init__(parent)
+        self.view = view
+        self.graph = None
+        self._pixmap = None
+        self._transform = None  # Scene to minimap coordinates, None while there is nothing to show
+        self.setFixedSize(220, 220)
+        self.setCursor(Qt.CursorShape.PointingHandCursor)
+        # Only the viewport frame moves with the view, the cached pixmap stays
+        view.viewport_changed.connect(self.update)
+        # The pixmap is drawn from the slot positions, which a drag changes
+        view.cards_moved.connect(self.invalidate)
+        
+    def set_graph(self, graph):
+        self.graph = graph
+        self.invalidate()
+        
+    def invalidate(self):
+        """Render the pixmap again on the next paint, after the layout changed"""
+        self._pixmap = None
+        self.update()
+        
+    @PROFILER.profiled("paint")
+    def render_pixmap(self):
+        pixmap = QPixmap(self.size())
+        pixmap.fill(QColor(Colors.BACKGROUND_DARK))
+        self._transform = None
+        slots = [slot for slot in self.graph.slots.values() if slot.placed] if self.graph else []
+        if slots:
+            rects = np.array([(slot.x, slot.y, slot.width, slot.height) for slot in slots])
+            left, top = rects[:, 0].min(), rects[:, 1].min()
+            right = (rects[:, 0] + rects[:, 2]).max()
+            bottom = (rects[:, 1] + rects[:, 3]).max()
+            width, height = self.width() - 2 * self.MARGIN, self.height() - 2 * self.MARGIN
+            scale = min(width / (right - left), height / (bottom - top))
+            dx = self.MARGIN + (width - (right - left) * scale) / 2 - left * scale
+            dy = self.MARGIN + (height - (bottom - top) * scale) / 2 - top * scale
+            
+            # Scale all cards at once, keeping even the smallest visible
+            rects[:, 0] = rects[:, 0] * scale + dx
+            rects[:, 1] = rects[:, 1] * scale + dy
+            rects[:, 2:] = np.maximum(rects[:, 2:] * scale, 1)
+            painter = QPainter(pixmap)
+            color = QColor(Colors.PRIMARY)
+            for x, y, w, h in rects.tolist():
+                painter.fillRect(QRectF(x, y, w, h), color)
+            painter.end()
+            self._transform = QTransform(scale, 0, 0, scale, dx, dy)
+        self._pixmap = pixmap
+        
+    def paintEvent(self, event):
+        if self._pixmap is None or self._pixmap.size() != self.size():
+            self.render_pixmap()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._pixmap)
+        if self._transform is not None:
+            visible = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+            painter.setPen(QPen(QColor(Colors.TEXT_PRIMARY), 1))
+            painter.setBrush(Qt.BrushStyle.NoBrush)
+            painter.drawRect(self._transform.mapRect(visible))
+        painter.setPen(QPen(QColor(Colors.GRID_LINE), 1))
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+        
+    def recenter(self, position):
+        if self._transform is not None:
+            self.view.centerOn(self._transform.inverted()[0].map(position))
+        
+    def mousePressEvent(self, event):
+        if event.button() == Qt.MouseButton.LeftButton:
+            self.recenter(event.position())
+            
+    def mouseMoveEvent(self, event):
+        if event.buttons() & Qt.MouseButton.LeftButton:
+            self.recenter(event.position())
+
 class RelationshipDelegate(QStyledItemDelegate):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -334,7 +1039,1767 @@ class RelationshipDelegate(QStyledItemDelegate):
                 painter.setPen(QPen(QColor("#2196F3")))  # Blue color for FK
                 painter.drawRect(rect.x() + 2, rect.y() + 2, rect.width() - 4, rect.height() - 4)
 
-class EnhancedTableWidget(QTableWidget):
+def format_cell_value(value):
+    """Return the display text for a raw SQLite value"""
+    if value is None:
+        return "NULL"
+    if isinstance(value, bytes):
+        return f"<BLOB {len(value)} bytes>"
+    return str(value)
+
+STATEMENT_CACHE_SIZE = 512  # Prepared statements kept per connection, sqlite3 defaults to 128
+
+CONNECTION_PRAGMAS = {
+    'mmap_size': 256 * 1024 * 1024,
+    'cache_size': -65536,  # 64 MiB
+    'temp_store': 'MEMORY',
+}
+
+# Connection pragmas selectable when opening a database
+PERFORMANCE_PROFILES = {
+    "Balanced": CONNECTION_PRAGMAS,
+    "Large Files": {
+        # SQLite caps the mapping at its compile-time SQLITE_MAX_MMAP_SIZE
+        'mmap_size': 1 << 40,
+        'cache_size': -262144,  # 256 MiB
+        'temp_store': 'MEMORY',
+        'threads': 4,  # Helper threads for large sorts
+    },
+    "Low Memory": {
+        'mmap_size': 0,
+        'cache_size': -8192,  # 8 MiB
+        'temp_store': 'FILE',
+        'threads': 0,
+    },
+}
+
+def open_readonly_connection(db_path, immutable=False):
+    """Open a read-only connection that may be handed between worker threads"""
+    uri = f"{Path(db_path).resolve().as_uri()}?mode=ro"
+    if immutable:
+        uri += "&immutable=1"
+    return sqlite3.connect(uri, uri=True, check_same_thread=False,
+                           cached_statements=STATEMENT_CACHE_SIZE)
+
+def apply_pragmas(conn, pragmas):
+    for name, value in pragmas.items():
+        conn.execute(f"PRAGMA {name} = {value}")
+    return conn
+
+def format_bytes(size):
+    for unit in ("bytes", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:,.0f} {unit}" if unit == "bytes" else f"{size:,.1f} {unit}"
+        size /= 1024
+
+class ReadMeter:
+    """Adds up how much row data queries delivered and how long they took.
+
+    The sqlite3 module exposes no I/O counters, so throughput is measured
+    as the in-memory size of the fetched rows over the time spent fetching
+    them. Safe to use from any thread.
+    """
+    def __init__(self):
+        self.bytes = 0
+        self.seconds = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, size, seconds):
+        with self._lock:
+            self.bytes += size
+            self.seconds += seconds
+
+    def wrap(self, func):
+        """Wrap a function returning rows so that every call is measured"""
+        @functools.wraps(func)
+        def measured(*args):
+            start = time.perf_counter()
+            rows = func(*args)
+            self.record(estimate_rows_size(rows), time.perf_counter() - start)
+            return rows
+        return measured
+
+    def summary(self):
+        with self._lock:
+            size, seconds = self.bytes, self.seconds
+        if not size:
+            return ""
+        rate = f"{format_bytes(size / seconds)}/s" if seconds else "-"
+        return f"Read {format_bytes(size)} at {rate}"
+
+class ConnectionManager:
+    """Opens and pools the connections used to browse and edit one database file.
+
+    Browsing goes through read-only URI connections, so on a WAL database
+    the viewer and other processes writing to it never wait for each other.
+    Up to max_readers idle readers are kept for the worker threads. The
+    single writer connection is used by the edit dialogs on the GUI thread
+    and is not available in read-only mode. An immutable database is read
+    without any locking or change detection, which is only safe for files
+    that nothing writes to while they are open.
+
+    data_version() tells the caches whether anything was committed since
+    they last looked, from PRAGMA data_version on one private connection
+    that no other code uses.
+    """
+    def __init__(self, db_path, read_only=False, immutable=False, pragmas=None, max_readers=4):
+        self.db_path = db_path
+        self.read_only = read_only or immutable
+        self.immutable = immutable
+        self.pragmas = dict(CONNECTION_PRAGMAS if pragmas is None else pragmas)
+        self.max_readers = max_readers
+        self.read_meter = ReadMeter()
+        self.closed = False
+        self._idle_readers = []
+        self._writer = None
+        self._monitor = None
+        self._lock = threading.Lock()
+        self._monitor_lock = threading.Lock()
+
+    def open_reader(self):
+        conn = apply_pragmas(open_readonly_connection(self.db_path, self.immutable), self.pragmas)
+        return PROFILER.instrument(conn)
+
+    def acquire_reader(self):
+        with self._lock:
+            if self._idle_readers:
+                return self._idle_readers.pop()
+        return self.open_reader()
+
+    def data_version(self):
+        """A number that changes whenever any connection commits to the database"""
+        with self._monitor_lock:
+            if self._monitor is None:
+                self._monitor = open_readonly_connection(self.db_path, self.immutable)
+            return self._monitor.execute("PRAGMA data_version").fetchone()[0]
+
+    def release_reader(self, conn):
+        if conn.in_transaction:
+            # A BEGIN from the query console would otherwise keep its snapshot
+            # open on the pooled connection, hiding later changes and pinning the WAL
+            try:
+                conn.rollback()
+            except sqlite3.Error:
+                conn.close()
+                return
+        with self._lock:
+            if not self.closed and len(self._idle_readers) < self.max_readers:
+                self._idle_readers.append(conn)
+                return
+        conn.close()
+
+    @property
+    def writer(self):
+        """The connection for changes, opened on first use; None in read-only mode"""
+        if self.read_only or self.closed:
+            return None
+        if self._writer is None:
+            self._writer = PROFILER.instrument(apply_pragmas(
+                sqlite3.connect(self.db_path, cached_statements=STATEMENT_CACHE_SIZE), self.pragmas))
+        return self._writer
+
+    def effective_settings(self):
+        """The cache settings SQLite actually applied, which may be capped below the profile's"""
+        conn = self.acquire_reader()
+        try:
+            mmap_size = conn.execute("PRAGMA mmap_size").fetchone()
+            cache_size = conn.execute("PRAGMA cache_size").fetchone()[0]
+            page_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        finally:
+            self.release_reader(conn)
+        return {
+            # Builds without mmap support return nothing
+            'mmap_size': mmap_size[0] if mmap_size else 0,
+            'cache_bytes': -cache_size * 1024 if cache_size < 0 else cache_size * page_size,
+        }
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            readers, self._idle_readers = self._idle_readers, []
+        for conn in readers:
+            conn.close()
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        with self._monitor_lock:
+            if self._monitor is not None:
+                self._monitor.close()
+                self._monitor = None
+
+class TaskCancelled(Exception):
+    pass
+
+class WorkerSignals(QObject):
+    rows = pyqtSignal(object, object)      # task, batch of rows
+    result = pyqtSignal(object, object)    # task, return value
+    error = pyqtSignal(object, str)        # task, message
+    done = pyqtSignal(object)              # task
+
+class QueryTask(QRunnable):
+    """A unit of database work run on the executor's thread pool.
+
+    The wrapped function is called as func(connection, *args). If it returns
+    a generator, every yielded batch is streamed back through the rows signal.
+    """
+    def __init__(self, executor, func, args, name=None):
+        super().__init__()
+        self.setAutoDelete(False)
+        self.executor = executor
+        self.func = func
+        self.args = args
+        self.name = name or getattr(func, '__qualname__', "query")
+        self.signals = WorkerSignals()
+        self.cancelled = False
+        self.on_result = None
+        self.on_rows = None
+        self.on_error = None
+        self.on_done = None
+        self._connection = None
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        with self._lock:
+            self.cancelled = True
+            if self._connection is not None:
+                self._connection.interrupt()
+
+    def run(self):
+        conn = None
+        try:
+            conn = self.executor.acquire_connection()
+            with self._lock:
+                if self.cancelled:
+                    raise TaskCancelled()
+                self._connection = conn
+
+            with PROFILER.span(self.name, "db"):
+                result = self.func(conn, *self.args)
+                if inspect.isgenerator(result):
+                    for batch in result:
+                        if self.cancelled:
+                            raise TaskCancelled()
+                        self.signals.rows.emit(self, batch)
+                    result = None
+            if not self.cancelled:
+                self.signals.result.emit(self, result)
+        except TaskCancelled:
+            pass
+        except Exception as e:
+            # An exception escaping run() would abort the whole application
+            if not self.cancelled:
+                self.signals.error.emit(self, str(e) or type(e).__name__)
+        finally:
+            with self._lock:
+                self._connection = None
+            if conn is not None:
+                self.executor.release_connection(conn)
+            self.signals.done.emit(self)
+
+class QueryExecutor(QObject):
+    """Runs queries on a thread pool against read-only connections from a ConnectionManager.
+
+    Callbacks are always invoked on the GUI thread, and never after the
+    executor has been closed. on_result, on_rows and on_error are not invoked
+    for tasks that were cancelled, but on_done is called once for every task,
+    whether it finished, failed or was cancelled.
+    """
+    busy_changed = pyqtSignal(bool)
+
+    def __init__(self, connections, max_threads=4, parent=None):
+        super().__init__(parent)
+        self.connections = connections
+        self.db_path = connections.db_path
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(max_threads)
+        self.closed = False
+        self.attachments = {}  # schema alias -> database file
+        self._tasks = set()
+
+    def attach(self, alias, path):
+        """Attach another database file to every worker connection"""
+        self.attachments[alias] = path
+
+    def acquire_connection(self):
+        conn = self.connections.acquire_reader()
+        if self.attachments:
+            attached = {row[1] for row in conn.execute("PRAGMA database_list")}
+            for alias, path in self.attachments.items():
+                if alias not in attached:
+                    conn.execute(f"ATTACH DATABASE ? AS {alias}",
+                                 (f"{Path(path).resolve().as_uri()}?mode=rwc",))
+        return conn
+
+    def release_connection(self, conn):
+        if self.closed:
+            conn.close()
+        else:
+            self.connections.release_reader(conn)
+
+    def submit(self, func, *args, on_result=None, on_rows=None, on_error=None, on_done=None,
+               name=None):
+        task = QueryTask(self, func, args, name)
+        task.on_result = on_result
+        task.on_rows = on_rows
+        task.on_error = on_error
+        task.on_done = on_done
+        task.signals.rows.connect(self._deliver_rows)
+        task.signals.result.connect(self._deliver_result)
+        task.signals.error.connect(self._deliver_error)
+        task.signals.done.connect(self._task_done)
+
+        self._tasks.add(task)
+        if len(self._tasks) == 1:
+            self.busy_changed.emit(True)
+        self.pool.start(task)
+        return task
+
+    def cancel(self, task):
+        task.cancel()
+        if self.pool.tryTake(task):
+            # The task never started, so it will not report back by itself
+            self._task_done(task)
+
+    def cancel_all(self):
+        for task in list(self._tasks):
+            self.cancel(task)
+
+    def close(self):
+        self.closed = True
+        self.cancel_all()
+        self.pool.waitForDone()
+
+    def _deliver_rows(self, task, rows):
+        if not self.closed and not task.cancelled and task.on_rows:
+            task.on_rows(rows)
+
+    def _deliver_result(self, task, result):
+        if not self.closed and not task.cancelled and task.on_result:
+            task.on_result(result)
+
+    def _deliver_error(self, task, message):
+        if not self.closed and not task.cancelled and task.on_error:
+            task.on_error(message)
+
+    def _task_done(self, task):
+        if task in self._tasks:
+            self._tasks.discard(task)
+            if not self.closed and task.on_done:
+                task.on_done()
+            if not self._tasks:
+                self.busy_changed.emit(False)
+
+def is_text_type(col_type):
+    """Whether a declared column type has TEXT (or no) affinity"""
+    col_type = (col_type or "").upper()
+    return not col_type or any(t in col_type for t in ("CHAR", "CLOB", "TEXT"))
+
+def column_affinity(col_type):
+    """SQLite type affinity of a declared column type"""
+    col_type = (col_type or "").upper()
+    if "INT" in col_type:
+        return "INTEGER"
+    if any(t in col_type for t in ("CHAR", "CLOB", "TEXT")):
+        return "TEXT"
+    if not col_type or "BLOB" in col_type:
+        return "BLOB"
+    if any(t in col_type for t in ("REAL", "FLOA", "DOUB")):
+        return "REAL"
+    return "NUMERIC"
+
+def parse_cell_value(text, col_type):
+    """Convert edited text to the value SQLite would store in a column of this type"""
+    affinity = column_affinity(col_type)
+    if affinity in ("INTEGER", "NUMERIC", "REAL"):
+        converters = (float,) if affinity == "REAL" else (int, float)
+        for convert in converters:
+            try:
+                return convert(text)
+            except ValueError:
+                pass
+    return text
+
+def build_search_filter(columns, search_text):
+    """Build a WHERE clause matching rows that contain search_text.
+
+    Text columns are always searched; numeric columns are only searched when
+    the text looks like a number. Returns (clause, params), or (None, []) when
+    there is nothing to filter on.
+    """
+    if not search_text:
+        return None, []
+    numeric = bool(re.fullmatch(r"[-+]?[\d.]+", search_text))
+    searched = [name for name, col_type in columns
+                if is_text_type(col_type) or (numeric and "BLOB" not in (col_type or "").upper())]
+    if not searched:
+        return "0", []
+
+    # LIKE is case-insensitive for ASCII; escape its wildcards in the user's text
+    pattern = "%" + re.sub(r"([\\%_])", r"\\\1", search_text) + "%"
+    clause = " OR ".join(f"\"{name}\" LIKE ? ESCAPE '\\'" for name in searched)
+    return f"({clause})", [pattern] * len(searched)
+
+def keyset_condition(order_keys, after_key, descending=False):
+    """WHERE condition and parameters selecting the rows that come after after_key.
+
+    None of the key values may be NULL, so the plain row value comparison
+    is exact and SQLite can seek to it in an index.
+    """
+    op = "<" if descending else ">"
+    if len(order_keys) == 1:
+        return f"{order_keys[0]} {op} ?", list(after_key)
+    placeholders = ", ".join("?" for _ in after_key)
+    return f"({', '.join(order_keys)}) {op} ({placeholders})", list(after_key)
+
+def fetch_table_page(conn, table_name, order_keys, after_key, limit, where=None, params=(),
+                     descending=False, sort_column=False):
+    """Fetch up to limit rows ordered by order_keys that follow after_key.
+
+    Each returned row starts with its order key values followed by the
+    table columns. An optional where clause restricts the rows returned.
+
+    With sort_column, the first order key is a column that may hold NULLs.
+    They sort first ascending and last descending, and no row value
+    comparison with NULL is true, so the NULL group and the other rows are
+    read in separate phases, each one a plain seek. Which phase to continue
+    in follows from after_key, and a page that ends one phase is filled up
+    from the next.
+    """
+    if not sort_column:
+        return fetch_phase(conn, table_name, order_keys, order_keys, after_key, limit,
+                           [where], params, descending)
+
+    first = order_keys[0]
+    null_phase = (f"{first} IS NULL", order_keys[1:], 1)  # condition, seek keys, key offset
+    value_phase = (f"{first} IS NOT NULL", order_keys, 0)
+    phases = [value_phase, null_phase] if descending else [null_phase, value_phase]
+    if after_key is not None:
+        current = null_phase if after_key[0] is None else value_phase
+        phases = phases[phases.index(current):]
+
+    rows = []
+    for condition, seek_keys, offset in phases:
+        seek = after_key[offset:] if after_key is not None else None
+        rows += fetch_phase(conn, table_name, order_keys, seek_keys, seek, limit - len(rows),
+                            [where, condition], params, descending)
+        if len(rows) == limit:
+            break
+        after_key = None  # The next phase starts at its beginning
+    return rows
+
+def fetch_phase(conn, table_name, order_keys, seek_keys, after_key, limit, conditions, params,
+                descending):
+    """Rows ordered by seek_keys that follow after_key, starting with their order key values"""
+    query = f'SELECT {", ".join(order_keys)}, * FROM "{table_name}"'
+    conditions = [condition for condition in conditions if condition]
+    params = list(params)
+    if after_key is not None:
+        condition, key_params = keyset_condition(seek_keys, after_key, descending)
+        conditions.append(condition)
+        params.extend(key_params)
+    if conditions:
+        query += " WHERE " + " AND ".join(f"({condition})" for condition in conditions)
+    direction = " DESC" if descending else ""
+    query += f" ORDER BY {', '.join(key + direction for key in seek_keys)} LIMIT {limit}"
+    return conn.execute(query, params).fetchall()
+
+def export_value(value):
+    """Make a cell value writable as text, BLOBs as hex"""
+    return value.hex() if isinstance(value, bytes) else value
+
+class CsvRowWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(columns)
+        
+    def write(self, rows):
+        self.writer.writerows([export_value(value) for value in row] for row in rows)
+        
+    def close(self):
+        self.file.close()
+
+class JsonLinesRowWriter:
+    def __init__(self, path, columns):
+        self.file = open(path, "w", encoding="utf-8")
+        self.columns = columns
+        self.encode = json.JSONEncoder(ensure_ascii=False).encode
+        
+    def write(self, rows):
+        self.file.writelines(self.encode(dict(zip(self.columns, map(export_value, row)))) + "\n"
+                             for row in rows)
+        
+    def close(self):
+        self.file.close()
+
+class ParquetRowWriter:
+    """Writes every batch as a row group; column types are taken from the first batch"""
+    
+    def __init__(self, path, columns):
+        self.path = path
+        self.columns = columns
+        self.writer = None
+        
+    def write(self, rows):
+        data = {name: [row[i] for row in rows] for i, name in enumerate(self.columns)}
+        try:
+            if self.writer is None:
+                table = pa.table(data)
+                # Columns that are all NULL so far are assumed to hold text
+                schema = pa.schema([pa.field(field.name, pa.string()) if pa.types.is_null(field.type) else field
+                                    for field in table.schema])
+                self.writer = pq.ParquetWriter(self.path, schema)
+            table = pa.table(data, schema=self.writer.schema)
+        except (pa.ArrowInvalid, pa.ArrowTypeError) as e:
+            raise ValueError(f"Column types do not fit Parquet: {e}") from e
+        self.writer.write_table(table)
+        
+    def close(self):
+        if self.writer is None:
+            # No rows, still write a valid file with text columns
+            schema = pa.schema([pa.field(name, pa.string()) for name in self.columns])
+            self.writer = pq.ParquetWriter(self.path, schema)
+        self.writer.close()
+
+ROW_WRITERS = {"csv": CsvRowWriter, "jsonl": JsonLinesRowWriter}
+if pa is not None:
+    ROW_WRITERS["parquet"] = ParquetRowWriter
+
+EXPORT_BATCH_SIZE = 5000
+
+def export_query(conn, query, params, path, fmt):
+    """Stream the rows of a query into a CSV, JSON Lines or Parquet file.
+
+    Rows are fetched EXPORT_BATCH_SIZE at a time, so memory use does not depend
+    on the size of the result. Yields the number of rows written so far after
+    every batch. The file is written next to path and only moved into place
+    once complete, so a cancelled or failed export leaves nothing behind.
+    """
+    cursor = conn.execute(query, params)
+    columns = [description[0] for description in cursor.description]
+    part_path = f"{path}.part"
+    writer = ROW_WRITERS[fmt](part_path, columns)
+    complete = False
+    written = 0
+    try:
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH_SIZE)
+            if not rows:
+                break
+            writer.write(rows)
+            written += len(rows)
+            yield written
+        writer.close()
+        os.replace(part_path, path)
+        complete = True
+    finally:
+        if not complete:
+            writer.close()
+            if os.path.exists(part_path):
+                os.remove(part_path)
+
+IMPORT_SAMPLE_ROWS = 1000
+IMPORT_BATCH_SIZE = 50000
+
+def infer_column_type(values):
+    """INTEGER or REAL if every sampled value reads as such a number, TEXT otherwise"""
+    column_type = None
+    for value in values:
+        if value is None or value == "":
+            continue
+        if isinstance(value, str):
+            try:
+                int(value)
+                column_type = column_type or "INTEGER"
+                continue
+            except ValueError:
+                pass
+            try:
+                float(value)
+                column_type = "REAL"
+                continue
+            except ValueError:
+                return "TEXT"
+        elif isinstance(value, int):
+            column_type = column_type or "INTEGER"
+        elif isinstance(value, float):
+            column_type = "REAL"
+        else:
+            return "TEXT"
+    return column_type or "TEXT"
+
+def json_cell_value(value):
+    """Store nested JSON as text and booleans as integers"""
+    if isinstance(value, (dict, list)):
+        return json.dumps(value, ensure_ascii=False)
+    if isinstance(value, bool):
+        return int(value)
+    return value
+
+class ImportSource:
+    """Rows of a CSV file with a header line, or of a JSON Lines file.
+
+    Column names and types are inferred from the first IMPORT_SAMPLE_ROWS
+    rows; for JSON Lines the columns are the keys seen in that sample.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.file = open(path, newline="", encoding="utf-8-sig")
+        try:
+            if Path(path).suffix.lower() in (".jsonl", ".ndjson"):
+                objects = self._json_objects()
+                sample = list(itertools.islice(objects, IMPORT_SAMPLE_ROWS))
+                self.columns = list(dict.fromkeys(key for obj in sample for key in obj))
+                self._rows = (tuple(json_cell_value(obj.get(name)) for name in self.columns)
+                              for obj in itertools.chain(sample, objects))
+                self.sample = [tuple(json_cell_value(obj.get(name)) for name in self.columns) for obj in sample]
+            else:
+                self._reader = csv.reader(self.file)
+                self.columns = next(self._reader, [])
+                self.sample = list(itertools.islice(self._reader, IMPORT_SAMPLE_ROWS))
+                self._rows = self._checked_csv_rows(itertools.chain(self.sample, self._reader))
+        except (csv.Error, ValueError) as e:
+            self.file.close()
+            raise ValueError(f"Cannot read {Path(path).name}: {e}") from e
+        if not self.columns:
+            self.file.close()
+            raise ValueError(f"No columns found in {Path(path).name}")
+        self.types = [infer_column_type(row[i] for row in self.sample if i < len(row))
+                      for i in range(len(self.columns))]
+        
+    def _json_objects(self):
+        for line_num, line in enumerate(self.file, 1):
+            if not line.strip():
+                continue
+            try:
+                obj = json.loads(line)
+            except ValueError as e:
+                raise ValueError(f"Line {line_num}: {e}") from e
+            if not isinstance(obj, dict):
+                raise ValueError(f"Line {line_num} is not a JSON object")
+            yield obj
+            
+    def _checked_csv_rows(self, rows):
+        try:
+            for row in rows:
+                if len(row) != len(self.columns):
+                    raise ValueError(f"Line {self._reader.line_num} has {len(row)} fields, "
+                                     f"expected {len(self.columns)}")
+                yield row
+        except csv.Error as e:
+            raise ValueError(f"Line {self._reader.line_num}: {e}") from e
+            
+    def rows(self):
+        return self._rows
+        
+    def progress(self):
+        """Fraction of the file read so far"""
+        return self.file.buffer.tell() / self.size if self.size else 1.0
+        
+    def close(self):
+        self.file.close()
+
+def import_rows(conn, db_path, create_query, table_name, column_names, source):
+    """Create a table and load all rows of an ImportSource into it in one transaction.
+
+    Uses a private writable connection with a large cache for the load, and
+    yields (rows loaded, fraction of the file read) after every batch. Empty
+    values are stored as NULL. Any error or a cancel rolls back, leaving no
+    table behind. The database keeps its own journal mode and sync setting,
+    so a crash during the import cannot corrupt it.
+    """
+    writer = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        writer.execute("PRAGMA cache_size = -262144")  # 256 MiB
+        writer.execute("PRAGMA temp_store = MEMORY")
+        writer.execute("BEGIN IMMEDIATE")
+        writer.execute(create_query)
+        
+        names = ", ".join(f'"{name}"' for name in column_names)
+        values = ", ".join("NULLIF(?, '')" for _ in column_names)
+        insert = f'INSERT INTO "{table_name}" ({names}) VALUES ({values})'
+        rows = source.rows()
+        loaded = 0
+        while True:
+            batch = list(itertools.islice(rows, IMPORT_BATCH_SIZE))
+            if not batch:
+                break
+            writer.executemany(insert, batch)
+            loaded += len(batch)
+            yield loaded, source.progress()
+        writer.execute("COMMIT")
+    finally:
+        if writer.in_transaction:
+            writer.execute("ROLLBACK")
+        writer.close()
+        source.close()
+
+CONSOLE_BATCH_SIZE = 1000
+CONSOLE_ROW_LIMIT = 100000
+
+def split_statements(script):
+    """Split SQL text into complete statements, without their trailing semicolons"""
+    statements = []
+    start = 0
+    for i, char in enumerate(script):
+        if char == ";" and sqlite3.complete_statement(script[start:i + 1]):
+            statements.append(script[start:i].strip())
+            start = i + 1
+    statements.append(script[start:].strip())
+    return [statement for statement in statements if statement]
+
+def run_statements(conn, statements):
+    """Run SQL statements one after another, yielding events as they progress.
+
+    For each statement this yields ('plan', i, rows) with its EXPLAIN QUERY
+    PLAN rows, ('columns', i, names) and ('rows', i, batch) when it returns
+    rows, then ('done', i, seconds, row count, truncated). At most
+    CONSOLE_ROW_LIMIT rows are fetched per statement.
+    """
+    for i, statement in enumerate(statements):
+        try:
+            plan = conn.execute(f"EXPLAIN QUERY PLAN {statement}").fetchall()
+        except sqlite3.Error:
+            plan = []  # Not every statement has a plan
+        yield 'plan', i, plan
+        
+        try:
+            start = time.perf_counter()
+            cursor = conn.execute(statement)
+            count = cursor.rowcount
+            truncated = False
+            if cursor.description:
+                yield 'columns', i, [description[0] for description in cursor.description]
+                count = 0
+                while count < CONSOLE_ROW_LIMIT:
+                    rows = cursor.fetchmany(min(CONSOLE_BATCH_SIZE, CONSOLE_ROW_LIMIT - count))
+                    if not rows:
+                        break
+                    count += len(rows)
+                    yield 'rows', i, rows
+                truncated = count == CONSOLE_ROW_LIMIT and cursor.fetchone() is not None
+            elapsed = time.perf_counter() - start
+        except sqlite3.Error as e:
+            raise sqlite3.Error(f"Statement {i + 1}: {e}") from e
+        yield 'done', i, elapsed, count, truncated
+
+def plan_warning(detail):
+    """Why a query plan step may be slow, or None"""
+    if "TEMP B-TREE" in detail:
+        return "Sorts or groups rows in a temporary B-tree"
+    if detail.startswith("SCAN ") and detail != "SCAN CONSTANT ROW":
+        return "Reads every row of the table or index"
+    return None
+
+# Words that can follow a table name in FROM or JOIN without being its alias
+NOT_ALIASES = {"where", "join", "inner", "left", "right", "full", "cross", "natural", "on",
+               "using", "group", "order", "limit", "union", "except", "intersect", "window",
+               "having", "indexed", "not", "set", "values", "as"}
+
+def statement_tables(statement, catalog):
+    """Map the names and aliases a statement uses for tables (lowercased) to the tables"""
+    tables = {table.lower(): table for table in catalog.tables}
+    used = {}
+    # A lookahead, so that a keyword taken for an alias is still seen as the next FROM or JOIN
+    for name, alias in re.findall(r'(?=(?:\bFROM|\bJOIN|,)\s+"?(\w+)"?(?:\s+(?:AS\s+)?"?(\w+)"?)?)',
+                                  statement, re.IGNORECASE):
+        table = tables.get(name.lower())
+        if table is None:
+            continue
+        used[name.lower()] = table
+        if alias and alias.lower() not in NOT_ALIASES:
+            used[alias.lower()] = table
+    return used
+
+def compared_columns(statement, token, table, catalog, used_tables):
+    """Columns of a table the statement compares with something, equality comparisons first.
+
+    A heuristic on the SQL text: qualified references (token.column) always
+    count, bare column names only if no other table in the statement has them.
+    """
+    other_columns = {col['name'].lower() for other in set(used_tables.values()) if other != table
+                     for col in catalog.columns[other]}
+    equal, ranges = [], []
+    for col in catalog.columns[table]:
+        name = re.escape(col['name'])
+        qualified = rf'\b{re.escape(token)}\s*\.\s*"?{name}"?(?![\w"])'
+        reference = qualified
+        if col['name'].lower() not in other_columns:
+            reference = rf'(?:{qualified}|(?<![.\w"])"?{name}"?(?![\w"]))'
+        if re.search(rf'{reference}\s*(?:==?|\bIN\b|\bIS\b)|(?:[^<>!]=)\s*{qualified}',
+                     statement, re.IGNORECASE):
+            equal.append(col['name'])
+        elif re.search(rf'{reference}\s*(?:[<>]|!=|\bBETWEEN\b)|[<>]\s*{qualified}',
+                       statement, re.IGNORECASE):
+            ranges.append(col['name'])
+    # An index serves any number of equality columns followed by one range
+    return equal + ranges[:1]
+
+def plan_index_candidates(statement, plan, catalog):
+    """(table, columns, reason) for every step of a query plan that an index could speed up"""
+    used = statement_tables(statement, catalog)
+    candidates = []
+    for _, _, _, detail in plan:
+        match = (re.match(r'SEARCH (?:TABLE )?"?(\w+)"?(?: AS \w+)? USING AUTOMATIC '
+                          r'(?:PARTIAL )?(?:COVERING )?INDEX \(([^)]*)\)', detail)
+                 or re.match(r'BLOOM FILTER ON "?(\w+)"? \(([^)]*)\)', detail))
+        if match:
+            table = used.get(match.group(1).lower())
+            if table:
+                columns = re.findall(r'(\w+)\s*[=<>]', match.group(2))
+                candidates.append((table, columns, "SQLite builds a temporary index for every run"))
+            continue
+        match = re.match(r'SCAN (?:TABLE )?"?(\w+)"?(?: AS (\w+))?', detail)
+        if match and detail != "SCAN CONSTANT ROW":
+            token = match.group(2) or match.group(1)
+            table = used.get(match.group(1).lower())
+            if table:
+                columns = compared_columns(statement, token, table, catalog, used)
+                if columns:
+                    candidates.append((table, columns, "Full scan to find rows by these columns"))
+    return candidates
+
+def create_index_sql(table, columns):
+    name = re.sub(r'\W', '_', "_".join(["idx", table, *columns]))
+    cols = ", ".join(f'"{column}"' for column in columns)
+    return f'CREATE INDEX IF NOT EXISTS "{name}" ON "{table}" ({cols})'
+
+def create_index(conn, db_path, sql):
+    """Run a CREATE INDEX on a private writable connection, as building it may take a while"""
+    writer = sqlite3.connect(db_path, isolation_level=None)
+    try:
+        writer.execute(sql)
+    finally:
+        writer.close()
+
+def advise_indexes(conn, catalog, observed):
+    """Rank missing indexes found from unindexed foreign keys and from plans of observed queries.
+
+    observed maps statements to (plan rows, times run). The estimated impact
+    of a suggestion is the rows a lookup without the index reads (the table's
+    estimated size) times how often the lookup was seen. Foreign keys count
+    once, as every join on them and every delete in the parent table does
+    such a lookup.
+    """
+    found = {}  # (table, columns) -> suggestion
+    
+    def suggest(table, columns, reason, times):
+        columns = tuple(columns)
+        if not columns or None in columns or catalog.is_indexed(table, columns):
+            return
+        suggestion = found.setdefault((table, columns), {
+            'table': table, 'columns': list(columns), 'reasons': [], 'times': 0})
+        if reason not in suggestion['reasons']:
+            suggestion['reasons'].append(reason)
+        suggestion['times'] += times
+        
+    for table in catalog.tables:
+        keys = {}
+        for fk in catalog.foreign_keys[table]:
+            keys.setdefault(fk['id'], []).append(fk)
+        for fks in keys.values():
+            parent = fks[0]['ref_table']
+            suggest(table, [fk['from'] for fk in fks],
+                    f"Unindexed foreign key: joins with {parent} and deletes in {parent} scan {table}", 1)
+    for statement, (plan, times) in observed.items():
+        for table, columns, reason in plan_index_candidates(statement, plan, catalog):
+            suggest(table, columns, reason, times)
+            
+    estimates = estimate_row_counts(conn, sorted({table for table, _ in found}), catalog.without_rowid)
+    for (table, columns), suggestion in found.items():
+        suggestion['rows'] = estimates[table] or 0
+        suggestion['impact'] = suggestion['rows'] * suggestion['times']
+        suggestion['sql'] = create_index_sql(table, columns)
+    return sorted(found.values(), key=lambda suggestion: -suggestion['impact'])
+
+class ObservedQueries:
+    """Query plans of the statements run in the app, for the index advisor. Only used from the GUI thread."""
+    MAX_STATEMENTS = 500
+    
+    def __init__(self):
+        self.statements = OrderedDict()  # statement -> (plan rows, times run)
+        
+    def observe(self, statement, plan):
+        statement = " ".join(statement.split())
+        _, times = self.statements.pop(statement, (None, 0))
+        self.statements[statement] = (plan, times + 1)
+        while len(self.statements) > self.MAX_STATEMENTS:
+            self.statements.popitem(last=False)
+            
+    def snapshot(self):
+        return dict(self.statements)
+
+class SearchIndex:
+    """Full-text search indexes for selected tables, kept in a sidecar database.
+
+    Each indexed table gets a contentless FTS5 table using the trigram
+    tokenizer, so a MATCH on a phrase finds the same substrings as the LIKE
+    filter without scanning the table. The sidecar file is attached to every
+    worker connection under the SCHEMA alias and removed when the index is
+    closed. When the connection manager's data version shows the database
+    changed since an index was built, the index is rebuilt.
+    """
+    SCHEMA = "search"
+    MIN_QUERY_LENGTH = 3  # Trigrams need at least three characters
+
+    def __init__(self, executor):
+        self.executor = executor
+        fd, self.path = tempfile.mkstemp(prefix="spacedb-search-", suffix=".sqlite")
+        os.close(fd)
+        executor.attach(self.SCHEMA, self.path)
+        self.indexes = {}  # table -> {'columns': [...], 'data_version': int}
+
+    def close(self):
+        for path in (self.path, self.path + "-wal", self.path + "-shm"):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def covers(self, table):
+        return table in self.indexes
+
+    def build(self, conn, table, columns):
+        """Index the text columns of a table (runs on a worker connection)"""
+        text_columns = [name for name, col_type in columns if is_text_type(col_type)]
+        if not text_columns:
+            raise sqlite3.OperationalError(f"{table} has no text columns to index")
+
+        # Read the version first so writes made during the build trigger a rebuild
+        version = self.executor.connections.data_version()
+        cols = ", ".join(f'"{name}"' for name in text_columns)
+        conn.execute(f"PRAGMA {self.SCHEMA}.journal_mode=WAL")
+        conn.execute(f'DROP TABLE IF EXISTS {self.SCHEMA}."{table}"')
+        conn.execute(f'CREATE VIRTUAL TABLE {self.SCHEMA}."{table}" '
+                     f"USING fts5({cols}, content='', tokenize='trigram')")
+        conn.execute(f'INSERT INTO {self.SCHEMA}."{table}"(rowid, {cols}) '
+                     f'SELECT rowid, {cols} FROM main."{table}"')
+        conn.commit()
+        self.indexes[table] = {'columns': text_columns, 'data_version': version}
+        return table
+
+    def refresh(self, conn, table, columns):
+        """Rebuild the index of a table if the database changed since it was built"""
+        index = self.indexes.get(table)
+        if index is not None and index['data_version'] == self.executor.connections.data_version():
+            return False
+        self.build(conn, table, columns)
+        return True
+
+    def filter_clause(self, table, search_text):
+        """WHERE clause selecting rows through the index, or None if it can't answer the search"""
+        if (table not in self.indexes or len(search_text) < self.MIN_QUERY_LENGTH
+                or re.fullmatch(r"[-+]?[\d.]+", search_text)):
+            # Numbers are left to the LIKE filter, which also searches numeric columns
+            return None
+        phrase = '"' + search_text.replace('"', '""') + '"'
+        return f'rowid IN (SELECT rowid FROM {self.SCHEMA}."{table}"(?))', [phrase]
+
+class SchemaCatalog:
+    """Table, column and foreign key metadata for a whole database.
+
+    Everything is read with table-valued pragma joins instead of one
+    PRAGMA per table, and only reloaded when PRAGMA schema_version changes.
+    A loaded catalog is never modified, so it can be shared between the GUI
+    thread and workers.
+    """
+    def __init__(self):
+        self.schema_version = None
+        self.tables = []
+        self.columns = {}          # table -> list of column dicts in cid order
+        self.foreign_keys = {}     # table -> list of outgoing foreign keys
+        self.referenced_by = {}    # table -> list of incoming foreign keys
+        self.indexes = {}          # table -> list of (index name, column names in index order)
+        self.without_rowid = set()
+
+    @classmethod
+    def load(cls, conn):
+        catalog = cls()
+        while True:
+            version = conn.execute("PRAGMA schema_version").fetchone()[0]
+            catalog._read(conn)
+            # Retry if the schema changed while we were reading it
+            if conn.execute("PRAGMA schema_version").fetchone()[0] == version:
+                catalog.schema_version = version
+                return catalog
+
+    def refreshed(self, conn):
+        """Return this catalog if it is still current, otherwise a freshly loaded one"""
+        version = conn.execute("PRAGMA schema_version").fetchone()[0]
+        if version == self.schema_version:
+            return self
+        return SchemaCatalog.load(conn)
+
+    def _read(self, conn):
+        self.tables = [name for name, in conn.execute(
+            "SELECT name FROM sqlite_master WHERE type='table'")]
+        self.without_rowid = self._without_rowid(conn)
+
+        self.columns = {table: [] for table in self.tables}
+        cursor = conn.execute("""
+            SELECT m.name, p.name, p.type, p."notnull", p.dflt_value, p.pk
+            FROM sqlite_master AS m
+            JOIN pragma_table_info(m.name) AS p
+            WHERE m.type = 'table'
+            ORDER BY m.name, p.cid
+        """)
+        for table, name, col_type, notnull, default, pk in cursor:
+            self.columns[table].append({
+                'name': name,
+                'type': col_type,
+                'notnull': bool(notnull),
+                'default': default,
+                'pk': pk,  # Position in the primary key, 0 if not part of it
+            })
+
+        self.foreign_keys = {table: [] for table in self.tables}
+        self.referenced_by = {table: [] for table in self.tables}
+        cursor = conn.execute("""
+            SELECT m.name, f.id, f.seq, f."table", f."from", f."to"
+            FROM sqlite_master AS m
+            JOIN pragma_foreign_key_list(m.name) AS f
+            WHERE m.type = 'table'
+            ORDER BY m.name, f.id, f.seq
+        """)
+        for table, fk_id, seq, ref_table, from_col, to_col in cursor.fetchall():
+            if to_col is None:
+                # REFERENCES parent without a column list points at the parent's primary key
+                pk = self.primary_key(ref_table)
+                to_col = pk[seq] if seq < len(pk) else None
+            fk = {'id': fk_id, 'seq': seq, 'table': table, 'from': from_col,
+                  'ref_table': ref_table, 'to': to_col}
+            self.foreign_keys[table].append(fk)
+            if ref_table in self.referenced_by:
+                self.referenced_by[ref_table].append(fk)
+
+        self.indexes = {table: [] for table in self.tables}
+        index_columns = {}
+        cursor = conn.execute("""
+            SELECT m.name, l.name, i.name
+            FROM sqlite_master AS m
+            JOIN pragma_index_list(m.name) AS l
+            JOIN pragma_index_info(l.name) AS i
+            WHERE m.type = 'table' AND NOT l.partial
+            ORDER BY m.name, l.name, i.seqno
+        """)
+        for table, index, column in cursor:
+            if (table, index) not in index_columns:
+                index_columns[table, index] = []
+                self.indexes[table].append((index, index_columns[table, index]))
+            index_columns[table, index].append(column)  # None for expressions
+
+    def _without_rowid(self, conn):
+        """Names of the WITHOUT ROWID tables, from pragma_table_list on SQLite 3.37 and later"""
+        try:
+            return {name for name, in conn.execute(
+                "SELECT name FROM pragma_table_list WHERE schema = 'main' AND wr")}
+        except sqlite3.OperationalError:
+            pass
+
+        # Older SQLite: only tables with a rowid can select it
+        without_rowid = set()
+        for table in self.tables:
+            try:
+                conn.execute(f'SELECT rowid FROM "{table}" LIMIT 0')
+            except sqlite3.OperationalError:
+                without_rowid.add(table)
+        return without_rowid
+
+    def primary_key(self, table):
+        """Primary key column names of a table in key order"""
+        pk_columns = [col for col in self.columns.get(table, []) if col['pk']]
+        return [col['name'] for col in sorted(pk_columns, key=lambda col: col['pk'])]
+
+    def order_keys(self, table):
+        """Columns giving a stable row order: rowid, or the primary key of a WITHOUT ROWID table"""
+        if table in self.without_rowid:
+            return [f'"{name}"' for name in self.primary_key(table)]
+        return ['rowid']
+
+    def is_indexed(self, table, columns):
+        """Whether an index (or the rowid) can look rows up by all of the given columns"""
+        pk = self.primary_key(table)
+        if table not in self.without_rowid and len(pk) == 1 and list(columns) == pk:
+            pk_type = next(col['type'] for col in self.columns[table] if col['name'] == pk[0])
+            if pk_type.upper() == "INTEGER":
+                return True  # An INTEGER PRIMARY KEY is the rowid itself
+        for _, index_columns in self.indexes.get(table, []):
+            if set(index_columns[:len(columns)]) == set(columns):
+                return True
+        return False
+
+    def column_foreign_key(self, table, column):
+        """The first foreign key leaving the given column, if any"""
+        for fk in self.foreign_keys.get(table, []):
+            if fk['from'] == column:
+                return fk
+        return None
+
+    def table_columns(self, table):
+        """Column information including relationships, as shown on the table cards"""
+        columns = []
+        for col in self.columns.get(table, []):
+            fk = self.column_foreign_key(table, col['name'])
+            columns.append({
+                'name': col['name'],
+                'type': col['type'],
+                'pk': bool(col['pk']),
+                'fk': fk is not None,
+                'fk_ref': {'table': fk['ref_table'], 'column': fk['to']} if fk else None
+            })
+        return columns
+
+    def table_metadata(self, table):
+        """Collect everything the table view needs before paging in rows"""
+        # Tables that reference each column of this table
+        referenced_by = {}
+        for fk in self.referenced_by.get(table, []):
+            if fk['table'] != table:
+                referenced_by.setdefault(fk['to'], []).append(fk['table'])
+
+        relationships = {}
+        for i, col in enumerate(self.table_columns(table)):
+            if col['pk']:
+                relationships[i] = {
+                    'type': 'pk',
+                    'referenced_by': referenced_by.get(col['name'], [])
+                }
+            elif col['fk']:
+                relationships[i] = {
+                    'type': 'fk',
+                    'ref_table': col['fk_ref']['table'],
+                    'ref_column': col['fk_ref']['column']
+                }
+
+        return {
+            'table_name': table,
+            'columns': [(col['name'], col['type']) for col in self.columns.get(table, [])],
+            'order_keys': self.order_keys(table),
+            'relationships': relationships,
+        }
+
+def estimate_rows_size(rows):
+    """Rough number of bytes a list of fetched rows takes in memory"""
+    return sum(sys.getsizeof(value) for row in rows for value in row) + 64 * len(rows)
+
+class PageCache:
+    """Result pages shared by all table models, dropped whenever the database changes.
+
+    Pages are keyed by (table, order keys, filter clause, filter parameters,
+    page number). All pages are discarded when anything was committed since
+    they were read, as told by the connection manager's data version. Beyond
+    max_bytes the least recently used pages are evicted. Only used from the
+    GUI thread.
+    """
+    DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+    def __init__(self, connections, max_bytes=DEFAULT_MAX_BYTES):
+        self.connections = connections
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.pages = OrderedDict()  # key -> (rows, size)
+        self._data_version = None
+
+    def close(self):
+        self.clear()
+
+    def clear(self):
+        self.pages.clear()
+        self.size = 0
+
+    def validate(self):
+        """Drop every page if the database changed since they were read"""
+        version = self.connections.data_version()
+        if version != self._data_version:
+            self.clear()
+            self._data_version = version
+
+    def get(self, key):
+        self.validate()
+        entry = self.pages.get(key)
+        if entry is None:
+            return None
+        self.pages.move_to_end(key)
+        return entry[0]
+
+    def put(self, key, rows):
+        self.validate()
+        old = self.pages.pop(key, None)
+        if old is not None:
+            self.size -= old[1]
+        size = estimate_rows_size(rows)
+        self.pages[key] = (rows, size)
+        self.size += size
+        while self.size > self.max_bytes and self.pages:
+            _, (_, evicted) = self.pages.popitem(last=False)
+            self.size -= evicted
+
+LARGE_TABLE_ROWS = 1_000_000  # Ask before operations that read all rows of larger tables
+SORT_INDEX_ROWS = 100_000     # Offer an index before sorting larger tables by an unindexed column
+
+ROW_SAMPLE = 100_000  # Rows counted per table when estimating row counts without sqlite_stat1
+
+def estimate_row_counts(conn, tables, without_rowid):
+    """Approximate rows per table without reading all of any of them.
+
+    Uses sqlite_stat1 when ANALYZE has been run. Other tables have their
+    first ROW_SAMPLE rows counted in rowid order, which is exact for smaller
+    tables. Larger ones are extrapolated from how densely those rows fill
+    the rowid range, so sparse ids do not inflate the estimate. Larger
+    WITHOUT ROWID tables that were never analyzed get None.
+    """
+    estimates = {}
+    try:
+        for table, stat in conn.execute("SELECT tbl, stat FROM sqlite_stat1"):
+            if stat:
+                estimates[table] = max(int(stat.split()[0]), estimates.get(table, 0))
+    except sqlite3.OperationalError:
+        pass  # No sqlite_stat1 table
+    for table in tables:
+        if table in estimates:
+            continue
+        if table in without_rowid:
+            count, = conn.execute(
+                f'SELECT count(*) FROM (SELECT 1 FROM "{table}" LIMIT {ROW_SAMPLE})').fetchone()
+            estimates[table] = count if count < ROW_SAMPLE else None
+            continue
+        count, low, last = conn.execute(
+            f'SELECT count(*), min(rowid), max(rowid) FROM '
+            f'(SELECT rowid FROM "{table}" ORDER BY rowid LIMIT {ROW_SAMPLE})').fetchone()
+        if count < ROW_SAMPLE:
+            estimates[table] = count
+            continue
+        high, = conn.execute(f'SELECT max(rowid) FROM "{table}"').fetchone()
+        estimates[table] = round(count * (high - low + 1) / (last - low + 1))
+    return {table: estimates[table] for table in tables}
+
+def count_rows(conn, table):
+    return conn.execute(f'SELECT count(*) FROM "{table}"').fetchone()[0]
+
+def table_sizes(conn):
+    """Bytes on disk of every table and index from the dbstat virtual table, or None if it's missing.
+
+    Returns {table: (table bytes, [(index, bytes), ...])}. dbstat reads every
+    page of the database, so this takes as long as a full scan of the file.
+    """
+    try:
+        if sqlite3.sqlite_version_info >= (3, 31):
+            sizes = dict(conn.execute("SELECT name, pgsize FROM dbstat('main', 1)"))
+        else:
+            sizes = dict(conn.execute("SELECT name, SUM(pgsize) FROM dbstat GROUP BY name"))
+    except sqlite3.OperationalError:
+        return None  # SQLite built without SQLITE_ENABLE_DBSTAT_VTAB
+    result = {}
+    for name, table, kind in conn.execute(
+            "SELECT name, tbl_name, type FROM sqlite_master WHERE type IN ('table', 'index')"):
+        _, indexes = result.setdefault(table, (0, []))
+        if kind == 'table':
+            result[table] = (sizes.get(name, 0), indexes)
+        else:
+            indexes.append((name, sizes.get(name, 0)))
+    return result
+
+class TableStatistics:
+    """Row counts and on-disk sizes per table, dropped whenever the database changes.
+
+    Results computed on the workers are stored under the data version
+    current when they arrive, so a database that is written to all the time
+    still shows recent figures. Only used from the GUI thread.
+    """
+    def __init__(self, connections):
+        self.connections = connections
+        self.estimates = {}    # table -> estimated rows, or None if unknown
+        self.counts = {}       # table -> exact rows
+        self.counting = set()  # tables with a COUNT(*) running on a worker
+        self.sizes = None      # result of table_sizes, once computed
+        self.dbstat_available = True
+        self._data_version = None
+
+    def close(self):
+        self.counting.clear()
+
+    def validate(self):
+        """Drop everything if the database changed, and return the current data version"""
+        version = self.connections.data_version()
+        if version != self._data_version:
+            self.estimates = {}
+            self.counts = {}
+            self.sizes = None
+            self._data_version = version
+        return version
+
+    def rows(self, table):
+        """Exact row count if known, otherwise the estimate"""
+        return self.counts.get(table, self.estimates.get(table))
+
+class SqliteTableModel(QAbstractTableModel):
+    """Read-only model that pages table rows in from SQLite as the view scrolls.
+
+    Pages are fetched in rowid order (or primary key order for WITHOUT ROWID
+    tables) using keyset pagination, so reading page N never scans the rows
+    before it. Only the most recently used pages are kept in memory.
+
+    With an executor, pages are loaded on worker threads and cells show up
+    empty until their page arrives; with a plain connection they are read
+    synchronously.
+
+    A search filter is applied in SQL, so filtered rows are paged in the
+    same way as the full table. When the table has a search index, the
+    filter goes through its FTS5 MATCH instead of a LIKE scan.
+
+    Sorting by a column is done in SQL as well, by seeking on the column
+    followed by the order keys, with NULLs paged separately (see
+    fetch_table_page). With an index on the column every page is an index
+    range read; without one each page sorts the whole table.
+
+    Pages are also shared through an optional PageCache, so showing a table
+    again while the database is unchanged needs no queries at all. Page
+    reads on workers are timed by an optional ReadMeter.
+    """
+    PAGE_SIZE = 500
+    MAX_CACHED_PAGES = 20
+    
+    load_failed = pyqtSignal(str)  # A page could not be read
+
+    def __init__(self, table_name, columns, order_keys, relationships=None,
+                 db=None, executor=None, filter_text="", search_index=None,
+                 page_cache=None, read_meter=None, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.executor = executor
+        self.page_cache = page_cache
+        self.read_meter = read_meter
+        self.table_name = table_name
+        self.columns = columns  # list of (name, type)
+        self.order_keys = order_keys
+        self.relationships = relationships or {}
+        self.search_index = search_index
+        self.filter_text = filter_text
+        self._where, self._params = self._build_filter(filter_text)
+        self.sort_column = None  # Column index, or None for the order keys alone
+        self.sort_descending = False
+        self._pending = {}
+
+        self._reset_pages()
+        self._load_first_page()
+
+    def _reset_pages(self):
+        # page_keys[i] is the key of the last row before page i (None for the first page)
+        self._page_keys = [None]
+        self._pages = OrderedDict()
+        self._loaded_rows = 0
+        self._at_end = False
+
+    def _load_first_page(self):
+        if self.executor is None:
+            self._loaded_rows = len(self._fetch_page(0))
+        else:
+            self._load_page(0)
+
+    def close(self):
+        """Cancel outstanding page loads"""
+        for task in list(self._pending.values()):
+            self.executor.cancel(task)
+        self._pending.clear()
+
+    def set_filter(self, filter_text):
+        """Only show rows containing filter_text, starting again from the first page"""
+        if filter_text == self.filter_text:
+            return
+        self._restart(lambda: self._set_filter_text(filter_text))
+
+    def _set_filter_text(self, filter_text):
+        self.filter_text = filter_text
+        self._where, self._params = self._build_filter(filter_text)
+
+    def sort(self, column, order=Qt.SortOrder.AscendingOrder):
+        """Order rows by a column in SQL, starting again from the first page; -1 restores key order"""
+        column = column if 0 <= column < len(self.columns) else None
+        descending = column is not None and order == Qt.SortOrder.DescendingOrder
+        if (column, descending) == (self.sort_column, self.sort_descending):
+            return
+        
+        def set_sort():
+            self.sort_column = column
+            self.sort_descending = descending
+        self._restart(set_sort)
+
+    def _restart(self, change):
+        """Apply a change to what the model shows and page it in again from the start"""
+        if self.executor is not None:
+            self.close()
+        self.beginResetModel()
+        change()
+        self._reset_pages()
+        self.endResetModel()
+        self._load_first_page()
+
+    @property
+    def seek_keys(self):
+        """Columns the rows are ordered and paged by: the sort column, then the order keys"""
+        if self.sort_column is None:
+            return self.order_keys
+        return [f'"{self.columns[self.sort_column][0]}"'] + self.order_keys
+
+    def _build_filter(self, filter_text):
+        if self.search_index is not None:
+            clause = self.search_index.filter_clause(self.table_name, filter_text)
+            if clause is not None:
+                return clause
+        return build_search_filter(self.columns, filter_text)
+
+    def export_query(self):
+        """Query and parameters for all rows the model shows, in the same order"""
+        columns = ", ".join(f'"{name}"' for name, _ in self.columns)
+        query = f'SELECT {columns} FROM "{self.table_name}"'
+        if self._where:
+            query += f" WHERE {self._where}"
+        direction = " DESC" if self.sort_descending else ""
+        query += f" ORDER BY {', '.join(key + direction for key in self.seek_keys)}"
+        return query, self._params
+
+    def _cache_key(self, page):
+        return (self.table_name, tuple(self.seek_keys), self.sort_descending,
+                self._where, tuple(self._params), page)
+
+    def _cached_page(self, page):
+        if self.page_cache is None:
+            return None
+        return self.page_cache.get(self._cache_key(page))
+
+    def _fetch_page(self, page):
+        rows = self._cached_page(page)
+        if rows is None:
+            rows = fetch_table_page(self.db, self.table_name, self.seek_keys,
+                                    self._page_keys[page], self.PAGE_SIZE, self._where,
+                                    self._params, self.sort_descending, self.sort_column is not None)
+            if self.page_cache is not None:
+                self.page_cache.put(self._cache_key(page), rows)
+        return self._store_page(page, rows)
+
+    def _load_page(self, page):
+        """Deliver a page from the shared cache right away, or request it from a worker"""
+        rows = self._cached_page(page)
+        if rows is None:
+            self._request_page(page)
+        else:
+            self._on_page_loaded(page, rows)
+
+    def _request_page(self, page):
+        if page in self._pending:
+            return
+        fetch = self.read_meter.wrap(fetch_table_page) if self.read_meter else fetch_table_page
+        task = self.executor.submit(
+            fetch, self.table_name, self.seek_keys,
+            self._page_keys[page], self.PAGE_SIZE, self._where, self._params, self.sort_descending,
+            self.sort_column is not None,
+            on_result=lambda rows: self._on_page_loaded(page, rows),
+            on_error=self.load_failed.emit,
+            on_done=lambda: self._on_page_done(page, task))
+        self._pending[page] = task
+
+    def _on_page_done(self, page, task):
+        # A failed or cancelled load may be requested again, e.g. by scrolling
+        if self._pending.get(page) is task:
+            del self._pending[page]
+
+    def _on_page_loaded(self, page, rows):
+        self._pending.pop(page, None)
+        if self.page_cache is not None:
+            self.page_cache.put(self._cache_key(page), rows)
+        is_frontier = page == len(self._page_keys) - 1 and not self._at_end
+        rows = self._store_page(page, rows)
+
+        if is_frontier:
+            if rows:
+                first = self._loaded_rows
+                self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+                self._loaded_rows += len(rows)
+                self.endInsertRows()
+        elif rows:
+            # A previously evicted page came back, repaint its rows
+            first = page * self.PAGE_SIZE
+            self.dataChanged.emit(self.index(first, 0),
+                                  self.index(first + len(rows) - 1, len(self.columns) - 1))
+
+    def _store_page(self, page, rows):
+        key_count = len(self.seek_keys)
+
+        # Fetching the frontier page tells us where the next one starts
+        if page == len(self._page_keys) - 1 and not self._at_end:
+            if len(rows) == self.PAGE_SIZE:
+                self._page_keys.append(tuple(rows[-1][:key_count]))
+            else:
+                self._at_end = True
+
+        self._pages[page] = rows
+        self._pages.move_to_end(page)
+        while len(self._pages) > self.MAX_CACHED_PAGES:
+            self._pages.popitem(last=False)
+        return self._pages[page]
+
+    def _page_row(self, row):
+        # Evicted pages are re-read synchronously, or requested from the
+        # executor in which case None is returned until they arrive
+        page, offset = divmod(row, self.PAGE_SIZE)
+        rows = self._pages.get(page)
+        if rows is None:
+            rows = self._cached_page(page)
+            if rows is not None:
+                rows = self._store_page(page, rows)
+            elif self.executor is not None:
+                self._request_page(page)
+                return None
+            else:
+                rows = self._fetch_page(page)
+        else:
+            self._pages.move_to_end(page)
+        return rows[offset] if offset < len(rows) else None
+
+    def row_values(self, row):
+        """Return the raw values of a loaded row, or None while its page is loading"""
+        values = self._page_row(row)
+        return values[len(self.seek_keys):] if values is not None else None
+
+    def row_key(self, row):
+        """Return the order key (rowid or primary key) of a loaded row"""
+        values = self._page_row(row)
+        if values is None:
+            return None
+        return tuple(values[len(self.seek_keys) - len(self.order_keys):len(self.seek_keys)])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded_rows
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    @property
+    def at_end(self):
+        """Whether the last row of the table or filter has been loaded"""
+        return self._at_end
+
+    def canFetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self._at_end:
+            return False
+        return len(self._page_keys) - 1 not in self._pending
+
+    def fetchMore(self, parent=QModelIndex()):
+        if not self.canFetchMore(parent):
+            return
+        page = len(self._page_keys) - 1
+        if self.executor is not None:
+            self._load_page(page)
+            return
+        rows = self._fetch_page(page)
+        if rows:
+            first = self._loaded_rows
+            self.beginInsertRows(QModelIndex(), first, first + len(rows) - 1)
+            self._loaded_rows += len(rows)
+            self.endInsertRows()
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            values = self.row_values(index.row())
+            return format_cell_value(values[index.column()]) if values else None
+
+        # Style cells based on relationships
+        rel = self.relationships.get(index.column())
+        if rel:
+            if role == Qt.ItemDataRole.BackgroundRole:
+                return QColor(Colors.PK_BACKGROUND if rel['type'] == 'pk' else Colors.FK_BACKGROUND)
+            if role == Qt.ItemDataRole.ForegroundRole:
+                return QColor(Colors.TEXT_PRIMARY)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Vertical:
+            return section + 1 if role == Qt.ItemDataRole.DisplayRole else None
+
+        name, col_type = self.columns[section]
+        rel = self.relationships.get(section)
+        if role == Qt.ItemDataRole.DisplayRole:
+            # Create header with relationship indicators
+            if rel and rel['type'] == 'pk':
+                name = f"🔑 {name}"
+            elif rel and rel['type'] == 'fk':
+                name = f"🔗 {name}"
+            return f"{name} ({col_type})"
+        if role == Qt.ItemDataRole.BackgroundRole and rel:
+            return QColor("#FFD700" if rel['type'] == 'pk' else "#2196F3")
+        return None
+
+class EditableTableModel(SqliteTableModel):
+    """Editable table model that keeps only pending changes in memory.
+
+    Rows are paged in like SqliteTableModel. Edited cells and deleted rows
+    are recorded against the key each row was read with, and added rows are
+    listed after the loaded ones. Values keep their SQLite types: edits are
+    converted using the column's affinity, NULLs stay NULL and BLOBs are
+    left untouched.
+    """
+    def __init__(self, table_name, columns, order_keys, db, parent=None):
+        super().__init__(table_name, columns, order_keys, db=db, parent=parent)
+        self.dirty_cells = {}    # key -> {column index: new value}
+        self.deleted_keys = set()
+        self.new_rows = []
+
+    def has_changes(self):
+        return bool(self.dirty_cells or self.deleted_keys or self.new_rows)
+
+    def is_new_row(self, row):
+        return row >= self._loaded_rows
+
+    def is_deleted(self, row):
+        return not self.is_new_row(row) and self.row_key(row) in self.deleted_keys
+
+    def cell_value(self, row, column):
+        if self.is_new_row(row):
+            return self.new_rows[row - self._loaded_rows][column]
+        key = self.row_key(row)
+        cells = self.dirty_cells.get(key)
+        if cells and column in cells:
+            return cells[column]
+        values = self.row_values(row)
+        return values[column] if values else None
+
+    def is_dirty(self, row, column):
+        if self.is_new_row(row):
+            return True
+        return column in self.dirty_cells.get(self.row_key(row), {})
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self._loaded_rows + len(self.new_rows)
+
+    def flags(self, index):
+        flags = super().flags(index)
+        if index.isValid() and not self.is_deleted(index.row()):
+            # BLOBs can't be typed in, they are only kept or set to NULL
+            if not isinstance(self.cell_value(index.row(), index.column()), bytes):
+                flags |= Qt.ItemFlag.ItemIsEditable
+        return flags
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        row, column = index.row(), index.column()
+
+        if role == Qt.ItemDataRole.DisplayRole:
+            return format_cell_value(self.cell_value(row, column))
+        if role == Qt.ItemDataRole.EditRole:
+            value = self.cell_value(row, column)
+            return "" if value is None else str(value)
+        if role == Qt.ItemDataRole.ForegroundRole:
+            if self.is_deleted(row) or self.cell_value(row, column) is None:
+                return QColor(Colors.TEXT_DISABLED)
+        if role == Qt.ItemDataRole.BackgroundRole and self.is_dirty(row, column):
+            return QColor(Colors.FK_BACKGROUND)
+        if role == Qt.ItemDataRole.FontRole and self.is_deleted(row):
+            font = QFont()
+            font.setStrikeOut(True)
+            return font
+        return None
+
+    def setData(self, index, value, role=Qt.ItemDataRole.EditRole):
+        if not index.isValid() or role != Qt.ItemDataRole.EditRole:
+            return False
+        row, column = index.row(), index.column()
+        original = self.cell_value(row, column)
+        if value == "" and original is None:
+            return False  # Leaving a NULL cell empty keeps it NULL
+        if value is not None:
+            value = parse_cell_value(value, self.columns[column][1])
+        if value == original and type(value) is type(original):
+            return False
+        self._set_cell(row, column, value)
+        return True
+
+    def set_null(self, index):
+        if self.cell_value(index.row(), index.column()) is not None:
+            self._set_cell(index.row(), index.column(), None)
+
+    def _set_cell(self, row, column, value):
+        if self.is_new_row(row):
+            self.new_rows[row - self._loaded_rows][column] = value
+        else:
+            self.dirty_cells.setdefault(self.row_key(row), {})[column] = value
+        index = self.index(row, column)
+        self.dataChanged.emit(index, index)
+
+    def add_row(self):
+        row = self.rowCount()
+        self.beginInsertRows(QModelIndex(), row, row)
+        self.new_rows.append([None] * len(self.columns))
+        self.endInsertRows()
+        return row
+
+    def toggle_deleted(self, row):
+        """Mark a loaded row for deletion (or undo that), or drop an added row"""
+        if self.is_new_row(row):
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.new_rows[row - self._loaded_rows]
+            self.endRemoveRows()
+            return
+        key = self.row_key(row)
+        if key in self.deleted_keys:
+            self.deleted_keys.discard(key)
+        else:
+            self.deleted_keys.add(key)
+        self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.columns) - 1))
+        self.headerDataChanged.emit(Qt.Orientation.Vertical, row, row)
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if orientation == Qt.Orientation.Vertical and role == Qt.ItemDataRole.DisplayRole:
+            if self.is_new_row(section):
+                return "*"
+            if self.is_deleted(section):
+                return "✕"
+        return super().headerData(section, orientation, role)
+
+class QueryResultModel(QAbstractTableModel):
+    """Rows of a console query, appended batch by batch as they are fetched"""
+    
+    def __init__(self, columns, parent=None):
+        super().__init__(parent)
+        self.columns = columns
+        self.rows = []
+        self.relationships = {}
+
+    def append_rows(self, rows):
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(rows) - 1)
+        self.rows.extend(rows)
+        self.endInsertRows()
+
+    def close(self):
+        pass
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.columns)
+
+    def data(self, index, role=Qt.ItemDataRole.DisplayRole):
+        if not index.isValid():
+            return None
+        value = self.rows[index.row()][index.column()]
+        if role == Qt.ItemDataRole.DisplayRole:
+            return format_cell_value(value)
+        if role == Qt.ItemDataRole.ForegroundRole and value is None:
+            return QColor(Colors.TEXT_DISABLED)
+        return None
+
+    def headerData(self, section, orientation, role=Qt.ItemDataRole.DisplayRole):
+        if role != Qt.ItemDataRole.DisplayRole:
+            return None
+        if orientation == Qt.Orientation.Vertical:
+            return section + 1
+        return self.columns[section]
+
+class EnhancedTableView(QTableView):
     def __init__(self, parent=None):
         super().__init__(parent)
         self.relationship_delegate = RelationshipDelegate()
@@ -346,29 +2811,41 @@ class EnhancedTableWidget(QTableWidget):
         self.setShowGrid(True)
         self.setGridStyle(Qt.PenStyle.SolidLine)
         self.setAlternatingRowColors(True)
-        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
-        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.ResizeToContents)
+        self.setEditTriggers(QTableView.EditTrigger.NoEditTriggers)  # Read-only
+        # Fixed row heights keep scrolling independent of how many rows are loaded
+        self.horizontalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Interactive)
+        self.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
         
         # Context menu
         self.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
         self.customContextMenuRequested.connect(self.show_context_menu)
         
+    @PROFILER.profiled("paint")
+    def paintEvent(self, event):
+        super().paintEvent(event)
+        
+    def setModel(self, model):
+        super().setModel(model)
+        self._model = model  # The view does not take ownership of the model
+        self.relationships = model.relationships if model is not None else {}
+        self.relationship_delegate.relationships = self.relationships
+        
     def show_context_menu(self, pos):
-        item = self.itemAt(pos)
-        if item:
-            col = self.column(item)
+        index = self.indexAt(pos)
+        if index.isValid():
+            col = index.column()
             if col in self.relationships:
                 menu = QMenu(self)
                 rel = self.relationships[col]
                 if rel['type'] == 'fk':
                     menu.addAction(f"Go to {rel['ref_table']}", 
-                                 lambda: self.parent().parent().show_related_table(rel['ref_table']))
+                                 lambda: self.window().show_related_table(rel['ref_table']))
                 menu.exec(self.viewport().mapToGlobal(pos))
     
     def mouseMoveEvent(self, event):
-        item = self.itemAt(event.pos())
-        if item:
-            col = self.column(item)
+        index = self.indexAt(event.pos())
+        if index.isValid():
+            col = index.column()
             if col in self.relationships:
                 rel = self.relationships[col]
                 if rel['type'] == 'pk':
@@ -490,10 +2967,42 @@ class TableColumnWidget(QWidget):
             if idx >= 0:
                 self.fk_info.setCurrentIndex(idx)
 
+def build_create_table_query(table_name, columns):
+    """CREATE TABLE statement for column definitions as collected by CreateTableDialog.
+
+    Each column is a dict with name, type, pk and notnull, plus fk_table and
+    fk_column when it references another table.
+    """
+    definitions = []
+    constraints = []
+    for column in columns:
+        col_def = [f'"{column["name"]}"', column['type']]
+        if column['pk']:
+            col_def.append("PRIMARY KEY")
+        if column['notnull']:
+            col_def.append("NOT NULL")
+        definitions.append(" ".join(col_def))
+        
+        # Add foreign key constraint if needed
+        if column.get('fk_table') and column.get('fk_column'):
+            constraints.append(
+                f'FOREIGN KEY ("{column["name"]}") '
+                f'REFERENCES "{column["fk_table"]}" '
+                f'("{column["fk_column"]}")'
+            )
+            
+    query = f'CREATE TABLE "{table_name}" (\n'
+    query += ",\n".join(definitions)
+    if constraints:
+        query += ",\n" + ",\n".join(constraints)
+    query += "\n)"
+    return query
+
 class CreateTableDialog(QDialog):
-    def __init__(self, parent=None, db=None):
+    def __init__(self, parent=None, db=None, catalog=None):
         super().__init__(parent)
         self.db = db
+        self.catalog = catalog or SchemaCatalog()
         self.setWindowTitle("Create New Table")
         self.setMinimumWidth(800)
         
@@ -518,9 +3027,10 @@ class CreateTableDialog(QDialog):
         # Buttons
         btn_layout = QHBoxLayout()
         add_col_btn = ModernButton("Add Column")
-        add_col_btn.clicked.connect(self.add_column)
+        add_col_btn.clicked.connect(lambda: self.add_column())
         create_btn = ModernButton("Create Table")
         create_btn.clicked.connect(self.create_table)
+        self.create_btn = create_btn
         cancel_btn = ModernButton("Cancel")
         cancel_btn.clicked.connect(self.reject)
         
@@ -535,10 +3045,18 @@ class CreateTableDialog(QDialog):
         self.update_available_references()
         self.add_column()  # Add initial column after everything is initialized
         
-    def add_column(self):
+    def add_column(self, name="", column_type=None):
         column = TableColumnWidget(self)
         self.columns_layout.addWidget(column)
         column.set_available_references(self.available_references)
+        column.name.setText(name)
+        if column_type:
+            # After the references, as picking one also sets the type
+            column.type.setCurrentText(column_type)
+        
+    def column_widgets(self):
+        return [self.columns_layout.itemAt(i).widget() for i in range(self.columns_layout.count())
+                if isinstance(self.columns_layout.itemAt(i).widget(), TableColumnWidget)]
         
     def update_available_references(self):
         """Get all available columns that can be referenced (primary keys and unique columns)"""
@@ -546,25 +3064,14 @@ class CreateTableDialog(QDialog):
             return
             
         self.available_references = []
-        cursor = self.db.cursor()
-        
-        # Get all tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-        tables = [row[0] for row in cursor.fetchall()]
+        self.catalog = self.catalog.refreshed(self.db)
         
         # Get column info for each table
-        for table in tables:
-            cursor.execute(f'PRAGMA table_info("{table}")')
-            columns = cursor.fetchall()
-            
+        for table in self.catalog.tables:
             # Add primary keys and unique columns
-            for col in columns:
-                name = col[1]
-                type_str = col[2]
-                is_pk = bool(col[5])
-                
-                if is_pk:  # Always include primary keys
-                    self.available_references.append((table, name, type_str, True))
+            for col in self.catalog.columns[table]:
+                if col['pk']:  # Always include primary keys
+                    self.available_references.append((table, col['name'], col['type'], True))
                     
         # Update all existing columns with the new references
         for i in range(self.columns_layout.count()):
@@ -572,78 +3079,96 @@ class CreateTableDialog(QDialog):
             if isinstance(widget, TableColumnWidget):
                 widget.set_available_references(self.available_references)
                 
-    def create_table(self):
-        if not self.table_name.text():
-            QMessageBox.warning(self, "Error", "Please enter a table name")
-            return
-            
-        columns = []
-        constraints = []
-        
-        for i in range(self.columns_layout.count()):
-            widget = self.columns_layout.itemAt(i).widget()
-            if isinstance(widget, TableColumnWidget):
-                if not widget.name.text():
-                    QMessageBox.warning(self, "Error", 
-                                      f"Please enter a name for column {i+1}")
-                    return
-                    
-                # Build column definition
-                col_def = [
-                    f'"{widget.name.text()}"',
-                    widget.type.currentText()
-                ]
-                
-                if widget.pk.isChecked():
-                    col_def.append("PRIMARY KEY")
-                if not widget.nullable.isChecked():
-                    col_def.append("NOT NULL")
-                    
-                columns.append(" ".join(col_def))
-                
-                # Add foreign key constraint if needed
-                if widget.fk.isChecked() and widget.fk_table.text() and widget.fk_column.text():
-                    constraints.append(
-                        f'FOREIGN KEY ("{widget.name.text()}") '
-                        f'REFERENCES "{widget.fk_table.text()}" '
-                        f'("{widget.fk_column.text()}")'
-                    )
+    def column_definitions(self):
+        """Column definitions for build_create_table_query, or None after a validation warning"""
+        if not self.table_name.text():
+            QMessageBox.warning(self, "Error", "Please enter a table name")
+            return None
+            
+        columns = []
+        for i, widget in enumerate(self.column_widgets()):
+            if not widget.name.text():
+                QMessageBox.warning(self, "Error", 
+                                  f"Please enter a name for column {i+1}")
+                return None
+            columns.append({
+                'name': widget.name.text(),
+                'type': widget.type.currentText(),
+                'pk': widget.pk.isChecked(),
+                'notnull': not widget.nullable.isChecked(),
+                'fk_table': widget.fk_table.text() if widget.fk.isChecked() else None,
+                'fk_column': widget.fk_column.text() if widget.fk.isChecked() else None,
+            })
         
         if not columns:
             QMessageBox.warning(self, "Error", "Please add at least one column")
+            return None
+        return columns
+        
+    def create_table(self):
+        columns = self.column_definitions()
+        if columns is None:
             return
             
         # Create the table
         try:
             cursor = self.db.cursor()
-            query = f'CREATE TABLE "{self.table_name.text()}" (\n'
-            query += ",\n".join(columns)
-            if constraints:
-                query += ",\n" + ",\n".join(constraints)
-            query += "\n)"
-            
-            cursor.execute(query)
+            cursor.execute(build_create_table_query(self.table_name.text(), columns))
             self.db.commit()
             self.accept()
             
         except sqlite3.Error as e:
             QMessageBox.critical(self, "Error", f"Failed to create table: {str(e)}")
 
+class ImportTableDialog(CreateTableDialog):
+    """Create table dialog filled in from a data file; the table is created by the import itself"""
+    
+    def __init__(self, parent, db, source, catalog=None):
+        super().__init__(parent, db, catalog)
+        self.source = source
+        self.query = None
+        self.setWindowTitle(f"Import {Path(source.path).name}")
+        self.table_name.setText(re.sub(r"\W+", "_", Path(source.path).stem))
+        self.create_btn.setText("Import")
+        
+        # Replace the empty starting column with the inferred ones
+        for widget in self.column_widgets():
+            self.columns_layout.removeWidget(widget)
+            widget.deleteLater()
+        for name, column_type in zip(source.columns, source.types):
+            self.add_column(name, column_type)
+            
+    def create_table(self):
+        columns = self.column_definitions()
+        if columns is None:
+            return
+        if len(columns) != len(self.source.columns):
+            QMessageBox.warning(self, "Error",
+                                f"The file has {len(self.source.columns)} columns, "
+                                f"please keep one table column for each")
+            return
+        self.column_names = [column['name'] for column in columns]
+        self.query = build_create_table_query(self.table_name.text(), columns)
+        self.accept()
+
 class EditTableDialog(QDialog):
-    def __init__(self, parent=None, db=None, table_name=None):
+    def __init__(self, parent=None, db=None, table_name=None, catalog=None):
         super().__init__(parent)
         self.db = db
         self.table_name = table_name
+        self.catalog = catalog or SchemaCatalog()
+        self.model = None
         self.setWindowTitle(f"Edit Table: {table_name}")
         self.setMinimumWidth(800)
         
         layout = QVBoxLayout(self)
         
-        # Create the table widget
-        self.table_widget = QTableWidget()
-        self.table_widget.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
-        self.table_widget.customContextMenuRequested.connect(self.show_context_menu)
-        layout.addWidget(self.table_widget)
+        # Create the table view
+        self.table_view = QTableView()
+        self.table_view.verticalHeader().setSectionResizeMode(QHeaderView.ResizeMode.Fixed)
+        self.table_view.setContextMenuPolicy(Qt.ContextMenuPolicy.CustomContextMenu)
+        self.table_view.customContextMenuRequested.connect(self.show_context_menu)
+        layout.addWidget(self.table_view)
         
         # Buttons
         btn_layout = QHBoxLayout()
@@ -667,67 +3192,80 @@ class EditTableDialog(QDialog):
             return
             
         try:
-            cursor = self.db.cursor()
+            self.catalog = self.catalog.refreshed(self.db)
+            self.columns = self.catalog.columns[self.table_name]
             
-            # Get column info
-            cursor.execute(f'PRAGMA table_info("{self.table_name}")')
-            self.columns = cursor.fetchall()
+            # Rows are paged in as the view scrolls; only edits are kept in memory
+            self.model = EditableTableModel(
+                self.table_name,
+                [(col['name'], col['type']) for col in self.columns],
+                self.catalog.order_keys(self.table_name),
+                self.db
+            )
+            self.table_view.setModel(self.model)
+            self.table_view.resizeColumnsToContents()
             
-            # Set up table widget
-            self.table_widget.setColumnCount(len(self.columns))
-            headers = [col[1] for col in self.columns]
-            self.table_widget.setHorizontalHeaderLabels(headers)
-            
-            # Get table data
-            cursor.execute(f'SELECT * FROM "{self.table_name}"')
-            data = cursor.fetchall()
-            
-            self.table_widget.setRowCount(len(data))
-            for i, row in enumerate(data):
-                for j, value in enumerate(row):
-                    item = QTableWidgetItem(str(value))
-                    self.table_widget.setItem(i, j, item)
-                    
-            self.table_widget.resizeColumnsToContents()
-            
-        except sqlite3.Error as e:
+        except (sqlite3.Error, KeyError) as e:
             QMessageBox.critical(self, "Error", f"Failed to load table data: {str(e)}")
             self.reject()
         
     def add_row(self):
-        row = self.table_widget.rowCount()
-        self.table_widget.insertRow(row)
+        row = self.model.add_row()
+        self.table_view.scrollTo(self.model.index(row, 0))
         
     def show_context_menu(self, pos):
+        index = self.table_view.indexAt(pos)
+        if not index.isValid():
+            return
+            
         menu = QMenu(self)
-        delete_action = menu.addAction("Delete Row")
-        action = menu.exec(self.table_widget.viewport().mapToGlobal(pos))
+        delete_text = "Restore Row" if self.model.is_deleted(index.row()) else "Delete Row"
+        delete_action = menu.addAction(delete_text)
+        null_action = menu.addAction("Set to NULL")
+        action = menu.exec(self.table_view.viewport().mapToGlobal(pos))
         
         if action == delete_action:
-            self.table_widget.removeRow(self.table_widget.rowAt(pos.y()))
+            self.model.toggle_deleted(index.row())
+        elif action == null_action:
+            self.model.set_null(index)
+            
+    def key_condition(self):
+        return " AND ".join(f"{key} = ?" for key in self.model.order_keys)
             
     def save_changes(self):
+        """Write only the deleted, edited and added rows, in a single transaction"""
+        table = f'"{self.table_name}"'
+        names = [name for name, _ in self.model.columns]
+        deleted = self.model.deleted_keys
+        
+        # Group updates by the set of columns they change so each group is one executemany
+        updates = {}
+        for key, cells in self.model.dirty_cells.items():
+            if key in deleted:
+                continue
+            cols = tuple(sorted(cells))
+            updates.setdefault(cols, []).append([cells[c] for c in cols] + list(key))
+        
         try:
             cursor = self.db.cursor()
             
-            # Get current data
-            cursor.execute(f'SELECT * FROM "{self.table_name}"')
-            old_data = cursor.fetchall()
+            if deleted:
+                cursor.executemany(f'DELETE FROM {table} WHERE {self.key_condition()}',
+                                   [list(key) for key in deleted])
             
-            # Delete all rows
-            cursor.execute(f'DELETE FROM "{self.table_name}"')
+            for cols, params in updates.items():
+                assignments = ", ".join(f'"{names[c]}" = ?' for c in cols)
+                cursor.executemany(
+                    f'UPDATE {table} SET {assignments} WHERE {self.key_condition()}',
+                    params
+                )
             
-            # Insert new data
-            for row in range(self.table_widget.rowCount()):
-                values = []
-                for col in range(self.table_widget.columnCount()):
-                    item = self.table_widget.item(row, col)
-                    values.append(item.text() if item else None)
-                    
-                placeholders = ",".join(["?" for _ in values])
-                cursor.execute(
-                    f'INSERT INTO "{self.table_name}" VALUES ({placeholders})',
-                    values
+            if self.model.new_rows:
+                placeholders = ",".join(["?" for _ in names])
+                columns = ", ".join(f'"{name}"' for name in names)
+                cursor.executemany(
+                    f'INSERT INTO {table} ({columns}) VALUES ({placeholders})',
+                    self.model.new_rows
                 )
                 
             self.db.commit()
@@ -736,19 +3274,404 @@ class EditTableDialog(QDialog):
         except sqlite3.Error as e:
             self.db.rollback()
             QMessageBox.critical(self, "Error", f"Failed to save changes: {str(e)}")
-            # Restore old data
+
+class QueryConsole(QWidget):
+    """SQL editor that runs statements on the read-only workers, with timings and query plans"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.task = None
+        self.statements = []
+        self.result_statement = None  # Statement whose rows are in the grid
+        
+        layout = QVBoxLayout(self)
+        self.editor = QPlainTextEdit()
+        self.editor.setPlaceholderText("SELECT ... (Ctrl+Enter to run; the console is read-only)")
+        self.editor.setFont(QFont("Consolas", 10))
+        QShortcut(QKeySequence("Ctrl+Return"), self.editor, activated=self.run)
+        
+        actions = QHBoxLayout()
+        self.run_btn = ModernButton("Run")
+        self.run_btn.clicked.connect(self.run)
+        self.export_btn = ModernButton("Export Results...")
+        self.export_btn.setToolTip("Save every row of the last result, not only those shown")
+        self.export_btn.clicked.connect(self.export_results)
+        self.export_btn.setEnabled(False)
+        actions.addWidget(self.run_btn)
+        actions.addWidget(self.export_btn)
+        actions.addStretch()
+        
+        self.results = EnhancedTableView()
+        self.plan_tree = QTreeWidget()
+        self.plan_tree.setHeaderLabels(["Query Plan"])
+        self.messages = QPlainTextEdit()
+        self.messages.setReadOnly(True)
+        
+        details = QSplitter(Qt.Orientation.Horizontal)
+        details.addWidget(self.plan_tree)
+        details.addWidget(self.messages)
+        splitter = QSplitter(Qt.Orientation.Vertical)
+        splitter.addWidget(self.editor)
+        splitter.addWidget(self.results)
+        splitter.addWidget(details)
+        splitter.setSizes([150, 400, 150])
+        
+        layout.addLayout(actions)
+        layout.addWidget(splitter)
+        
+    def run(self):
+        executor = self.window().executor
+        if not executor:
+            self.messages.appendPlainText("Open a database first")
+            return
+        statements = split_statements(self.editor.toPlainText())
+        if not statements:
+            return
+            
+        if self.task is not None:
+            executor.cancel(self.task)
+        self.statements = statements
+        self.result_statement = None
+        self.plan_tree.clear()
+        self.messages.clear()
+        self.export_btn.setEnabled(False)
+        self.task = executor.submit(run_statements, statements,
+                                    on_rows=self.on_event,
+                                    on_result=lambda _: self.on_finished(),
+                                    on_error=self.on_error)
+        
+    def on_event(self, event):
+        kind, i = event[0], event[1]
+        if kind == 'plan':
+            self.show_plan(i, event[2])
+            if event[2]:
+                self.window().observed_queries.observe(self.statements[i], event[2])
+        elif kind == 'columns':
+            self.result_statement = i
+            self.results.setModel(QueryResultModel(event[2]))
+        elif kind == 'rows':
+            self.results.model().append_rows(event[2])
+        elif kind == 'done':
+            elapsed, count, truncated = event[2:]
+            outcome = f"{count:,} rows" if i == self.result_statement else "done"
+            note = f" (stopped after the first {count:,} rows)" if truncated else ""
+            self.messages.appendPlainText(f"Statement {i + 1}: {outcome} in {elapsed * 1000:.1f} ms{note}")
+            
+    def show_plan(self, i, plan):
+        statement = " ".join(self.statements[i].split())
+        top = QTreeWidgetItem(self.plan_tree, [f"Statement {i + 1}: {statement[:80]}"])
+        items = {0: top}
+        for node_id, parent_id, _, detail in plan:
+            item = QTreeWidgetItem(items.get(parent_id, top), [detail])
+            items[node_id] = item
+            warning = plan_warning(detail)
+            if warning:
+                item.setText(0, f"⚠ {detail}")
+                item.setToolTip(0, warning)
+                item.setForeground(0, QColor(Colors.ACCENT_WARNING))
+        self.plan_tree.expandAll()
+        
+    def on_finished(self):
+        self.task = None
+        self.export_btn.setEnabled(self.result_statement is not None)
+        self.results.resizeColumnsToContents()
+        
+    def on_error(self, message):
+        self.task = None
+        self.messages.appendPlainText(f"Error: {message}")
+        
+    def export_results(self):
+        if self.result_statement is not None:
+            self.window().export_rows(self.statements[self.result_statement], (), "query")
+
+class StatisticsPanel(QWidget):
+    """Estimated and exact row counts and on-disk sizes per table, largest tables first"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        layout = QVBoxLayout(self)
+        
+        actions = QHBoxLayout()
+        self.refresh_btn = ModernButton("Refresh")
+        self.refresh_btn.clicked.connect(self.refresh)
+        self.count_btn = ModernButton("Count All Rows")
+        self.count_btn.setToolTip("Run an exact COUNT(*) on every table (double-click a table to count one)")
+        self.count_btn.clicked.connect(self.count_all)
+        self.sizes_btn = ModernButton("Compute Sizes")
+        self.sizes_btn.setToolTip("Measure every table and index with dbstat, which reads the whole file")
+        self.sizes_btn.clicked.connect(self.compute_sizes)
+        self.summary_label = QLabel()
+        actions.addWidget(self.refresh_btn)
+        actions.addWidget(self.count_btn)
+        actions.addWidget(self.sizes_btn)
+        actions.addWidget(self.summary_label)
+        actions.addStretch()
+        
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Table", "Estimated Rows", "Exact Rows", "Size"])
+        self.tree.itemDoubleClicked.connect(self.on_item_double_clicked)
+        
+        layout.addLayout(actions)
+        layout.addWidget(self.tree)
+        
+    def refresh(self):
+        viewer = self.window()
+        if viewer.executor:
+            viewer.with_catalog(self.load_estimates)
+        
+    def load_estimates(self, catalog):
+        viewer = self.window()
+        stats = viewer.table_stats
+        stats.validate()
+        if all(table in stats.estimates for table in catalog.tables):
+            self.populate()
+            return
+            
+        def on_result(estimates):
+            stats.validate()
+            stats.estimates.update(estimates)
+            self.populate()
+            
+        viewer.executor.submit(estimate_row_counts, catalog.tables, catalog.without_rowid,
+                               on_result=on_result, on_error=viewer.show_query_error)
+        
+    def count_table(self, table):
+        viewer = self.window()
+        stats = viewer.table_stats
+        stats.validate()
+        if table in stats.counts or table in stats.counting:
+            return
+        stats.counting.add(table)
+            
+        def on_result(count):
+            stats.validate()
+            stats.counts[table] = count
+            self.populate()
+            
+        viewer.executor.submit(count_rows, table, on_result=on_result,
+                               on_error=viewer.show_query_error,
+                               on_done=lambda: stats.counting.discard(table))
+        
+    def count_all(self):
+        viewer = self.window()
+        if not viewer.executor:
+            return
+        # One task per table, so the counts run in parallel on the worker pool
+        for table in viewer.catalog.tables:
+            self.count_table(table)
+            
+    def compute_sizes(self):
+        viewer = self.window()
+        if not viewer.executor:
+            return
+        stats = viewer.table_stats
+        
+        def on_result(sizes):
+            stats.validate()
+            stats.sizes = sizes
+            stats.dbstat_available = sizes is not None
+            viewer.status_label.setText("Table sizes measured")
+            self.populate()
+            
+        viewer.status_label.setText("Measuring tables with dbstat...")
+        viewer.executor.submit(table_sizes, on_result=on_result, on_error=viewer.show_query_error)
+        
+    def on_item_double_clicked(self, item):
+        if item.parent() is None and self.window().executor:
+            self.count_table(item.text(0))
+            
+    def populate(self):
+        viewer = self.window()
+        stats = viewer.table_stats
+        if stats is None:
+            return
+        stats.validate()
+        if any(table not in stats.estimates for table in viewer.catalog.tables):
+            # The database changed since the estimates were made
+            self.load_estimates(viewer.catalog)
+            return
+        
+        def format_rows(value, approximate=False):
+            if value is None:
+                return ""
+            return f"~{value:,}" if approximate else f"{value:,}"
+            
+        tables = sorted(viewer.catalog.tables, key=lambda t: -(stats.rows(t) or 0))
+        self.tree.clear()
+        for table in tables:
+            table_bytes, indexes = (stats.sizes or {}).get(table, (None, []))
+            item = QTreeWidgetItem(self.tree, [
+                table,
+                format_rows(stats.estimates.get(table), approximate=True),
+                format_rows(stats.counts.get(table)),
+                format_bytes(table_bytes) if table_bytes is not None else "",
+            ])
+            if (stats.rows(table) or 0) > LARGE_TABLE_ROWS:
+                item.setForeground(0, QColor(Colors.ACCENT_WARNING))
+            for index, index_bytes in indexes:
+                QTreeWidgetItem(item, [index, "", "", format_bytes(index_bytes)])
+        for column in range(1, 4):
+            self.tree.resizeColumnToContents(column)
+            
+        total_rows = sum(stats.rows(table) or 0 for table in tables)
+        summary = f"{len(tables):,} tables, ~{total_rows:,} rows"
+        if stats.sizes is not None:
+            total_bytes = sum(size + sum(b for _, b in indexes)
+                              for size, indexes in stats.sizes.values())
+            summary += f", {format_bytes(total_bytes)} on disk"
+        elif not stats.dbstat_available:
+            summary += " (sizes need SQLite with the dbstat table)"
+        self.summary_label.setText(summary)
+        
+class IndexAdvisorPanel(QWidget):
+    """Missing indexes suggested from foreign keys and the queries run in the console"""
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.task = None
+        layout = QVBoxLayout(self)
+        
+        actions = QHBoxLayout()
+        self.analyze_btn = ModernButton("Analyze")
+        self.analyze_btn.setToolTip("Check foreign keys and the plans of queries run in the Query tab")
+        self.analyze_btn.clicked.connect(self.analyze)
+        self.create_btn = ModernButton("Create Index")
+        self.create_btn.setToolTip("Create the selected index now")
+        self.create_btn.clicked.connect(self.create_index)
+        self.create_btn.setEnabled(False)
+        self.summary_label = QLabel()
+        actions.addWidget(self.analyze_btn)
+        actions.addWidget(self.create_btn)
+        actions.addWidget(self.summary_label)
+        actions.addStretch()
+        
+        self.tree = QTreeWidget()
+        self.tree.setHeaderLabels(["Table", "Columns", "Estimated Rows Read", "Reason"])
+        self.tree.setRootIsDecorated(False)
+        self.tree.currentItemChanged.connect(self.update_buttons)
+        
+        layout.addLayout(actions)
+        layout.addWidget(self.tree)
+        
+    def analyze(self):
+        viewer = self.window()
+        if not viewer.executor:
+            return
+        observed = viewer.observed_queries.snapshot()
+        viewer.with_catalog(lambda catalog: self.run_analysis(catalog, observed))
+        
+    def run_analysis(self, catalog, observed):
+        viewer = self.window()
+        if self.task is not None:
+            viewer.executor.cancel(self.task)
+        self.summary_label.setText("Analyzing...")
+        self.task = viewer.executor.submit(advise_indexes, catalog, observed,
+                                           on_result=self.show_suggestions,
+                                           on_error=viewer.show_query_error)
+        
+    def show_suggestions(self, suggestions):
+        self.task = None
+        self.tree.clear()
+        for suggestion in suggestions:
+            item = QTreeWidgetItem(self.tree, [
+                suggestion['table'],
+                ", ".join(suggestion['columns']),
+                f"~{suggestion['impact']:,}",
+                "; ".join(suggestion['reasons']),
+            ])
+            item.setData(0, Qt.ItemDataRole.UserRole, suggestion['sql'])
+            item.setToolTip(0, suggestion['sql'])
+        for column in range(3):
+            self.tree.resizeColumnToContents(column)
+        self.summary_label.setText(f"{len(suggestions)} missing indexes" if suggestions
+                                   else "No missing indexes found")
+        self.update_buttons()
+        
+    def update_buttons(self):
+        self.create_btn.setEnabled(self.tree.currentItem() is not None
+                                   and self.window().current_db is not None)
+        
+    def create_index(self):
+        item = self.tree.currentItem()
+        viewer = self.window()
+        if item is None or viewer.current_db is None:
+            return
+        viewer.create_index(item.data(0, Qt.ItemDataRole.UserRole),
+                            f"{item.text(0)} ({item.text(1)})",
+                            on_created=lambda catalog: self.analyze())
+        
+class ProfilerPane(QWidget):
+    """Log of profiler spans and statements as they are recorded, with Chrome trace export"""
+    MAX_LINES = 5000
+    
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.seen = 0
+        layout = QVBoxLayout(self)
+        layout.setContentsMargins(0, 0, 0, 0)
+        
+        actions = QHBoxLayout()
+        self.export_btn = ModernButton("Export Trace...")
+        self.export_btn.setToolTip("Save everything recorded as a Chrome trace (chrome://tracing, Perfetto)")
+        self.export_btn.clicked.connect(self.export_trace)
+        self.clear_btn = ModernButton("Clear")
+        self.clear_btn.clicked.connect(self.clear)
+        actions.addWidget(QLabel("Profiler"))
+        actions.addStretch()
+        actions.addWidget(self.clear_btn)
+        actions.addWidget(self.export_btn)
+        
+        self.log = QPlainTextEdit()
+        self.log.setReadOnly(True)
+        self.log.setFont(QFont("Consolas", 9))
+        self.log.setMaximumBlockCount(self.MAX_LINES)
+        
+        layout.addLayout(actions)
+        layout.addWidget(self.log)
+        
+        # Events are recorded on any thread, the log picks them up periodically
+        self.poll_timer = QTimer(self)
+        self.poll_timer.setInterval(500)
+        self.poll_timer.timeout.connect(self.poll)
+        
+    def set_active(self, active):
+        PROFILER.enabled = active
+        self.setVisible(active)
+        if active:
+            self.poll_timer.start()
+        else:
+            self.poll_timer.stop()
+            self.poll()
+            
+    @staticmethod
+    def format_event(event):
+        duration = f"{event['dur'] / 1000:9.2f} ms" if 'dur' in event else f"{'instant':>12}"
+        return f"{duration}  {event['cat']:<5}  {event['name']}"
+        
+    def poll(self):
+        events, self.seen = PROFILER.events_since(self.seen)
+        lines = [self.format_event(event) for event in events[-self.MAX_LINES:]]
+        if lines:
+            self.log.appendPlainText("\n".join(lines))
+            
+    def clear(self):
+        PROFILER.clear()
+        self.seen = 0
+        self.log.clear()
+        
+    def export_trace(self):
+        path, _ = QFileDialog.getSaveFileName(self, "Export Trace", "trace.json", "Chrome Trace (*.json)")
+        if path:
             try:
-                cursor.execute(f'DELETE FROM "{self.table_name}"')
-                placeholders = ",".join(["?" for _ in old_data[0]])
-                cursor.executemany(
-                    f'INSERT INTO "{self.table_name}" VALUES ({placeholders})',
-                    old_data
-                )
-                self.db.commit()
-            except sqlite3.Error as restore_error:
-                QMessageBox.critical(self, "Error", 
-                    f"Failed to restore data: {str(restore_error)}\n"
-                    "Please check the table data manually.")
+                PROFILER.write_chrome_trace(path)
+            except OSError as e:
+                QMessageBox.critical(self, "Error", f"Failed to export trace: {str(e)}")
+                
+OPEN_MODES = {
+    "Read/Write": {},
+    "Read-Only": {'read_only': True},
+    "Immutable Snapshot": {'immutable': True},
+}
 
 class DatabaseViewer(QMainWindow):
     def __init__(self):
@@ -756,6 +3679,21 @@ class DatabaseViewer(QMainWindow):
         self.setWindowTitle("SpaceDB Viewer")
         self.setGeometry(100, 100, 1200, 800)
         self.current_db = None
+        self.current_table = None
+        self.connections = None
+        self.cache_settings = ""
+        self.executor = None
+        self.layout_task = None
+        self.search_index = None
+        self.page_cache = None
+        self.table_stats = None
+        self.observed_queries = ObservedQueries()
+        self.declined_indexes = set()  # (table, column) the user chose to sort without an index
+        self.creating_indexes = set()  # CREATE INDEX statements running on the executor
+        self.catalog = SchemaCatalog()
+        self.graph = SchemaGraph()
+        self.cards = {}  # Materialized cards by table name
+        self.connectors = {}  # Connectors by SchemaGraph edge key
         
         # Set window background
         self.setStyleSheet(f"""
@@ -779,13 +3717,13 @@ class DatabaseViewer(QMainWindow):
             QTabBar::tab:selected {{
                 background-color: {Colors.PRIMARY};
             }}
-            QTableWidget {{
+            QTableView {{
                 background-color: {Colors.BACKGROUND_LIGHT};
                 color: {Colors.TEXT_PRIMARY};
                 gridline-color: {Colors.GRID_LINE};
                 border: none;
             }}
-            QTableWidget::item {{
+            QTableView::item {{
                 padding: 5px;
             }}
             QHeaderView::section {{
@@ -830,6 +3768,18 @@ class DatabaseViewer(QMainWindow):
         self.open_btn.clicked.connect(self.open_database)
         db_controls.addWidget(self.open_btn)
         
+        self.open_mode_combo = QComboBox()
+        self.open_mode_combo.addItems(OPEN_MODES)
+        self.open_mode_combo.setToolTip("Read-only never writes to the file; an immutable "
+                                        "snapshot also skips locking, for files nothing else changes")
+        db_controls.addWidget(self.open_mode_combo)
+        
+        self.profile_combo = QComboBox()
+        self.profile_combo.addItems(PERFORMANCE_PROFILES)
+        self.profile_combo.setToolTip("Memory mapping and page cache settings; "
+                                      "Large Files reads big databases through the OS page cache")
+        db_controls.addWidget(self.profile_combo)
+        
         # Add create and edit table buttons
         self.create_table_btn = ModernButton("Create Table")
         self.create_table_btn.clicked.connect(self.create_table)
@@ -841,20 +3791,32 @@ class DatabaseViewer(QMainWindow):
         self.edit_table_btn.setEnabled(False)
         db_controls.addWidget(self.edit_table_btn)
         
+        self.import_btn = ModernButton("Import Data")
+        self.import_btn.setToolTip("Load a CSV or JSON Lines file into a new table")
+        self.import_btn.clicked.connect(self.import_data)
+        self.import_btn.setEnabled(False)
+        db_controls.addWidget(self.import_btn)
+        
         # Add search box
         search_layout = QHBoxLayout()
         search_label = QLabel("Search:")
         search_label.setStyleSheet(f"color: {Colors.TEXT_PRIMARY};")
         self.search_box = QLineEdit()
         self.search_box.setPlaceholderText("Search tables and content...")
-        self.search_box.textChanged.connect(self.filter_content)
+        self.search_box.textChanged.connect(self.schedule_filter)
+        
+        # Wait for a pause in typing before filtering
+        self.filter_timer = QTimer(self)
+        self.filter_timer.setSingleShot(True)
+        self.filter_timer.setInterval(300)
+        self.filter_timer.timeout.connect(self.filter_content)
         search_layout.addWidget(search_label)
         search_layout.addWidget(self.search_box)
         db_controls.addLayout(search_layout)
         
         # Add layout dropdown
         self.layout_combo = QComboBox()
-        self.layout_combo.addItems(["Grid Layout", "Circular Layout", "Spring Layout"])
+        self.layout_combo.addItems(LAYOUT_ENGINES)
         self.layout_combo.currentTextChanged.connect(self.rearrange_cards)
         db_controls.addWidget(QLabel("Layout:"))
         db_controls.addWidget(self.layout_combo)
@@ -871,15 +3833,34 @@ class DatabaseViewer(QMainWindow):
         view_controls.addWidget(self.zoom_out_btn)
         view_controls.addWidget(self.reset_view_btn)
         
+        # Progress indicator for background queries
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 0)  # Busy indicator
+        self.progress_bar.setMaximumWidth(120)
+        self.progress_bar.setTextVisible(False)
+        self.progress_bar.hide()
+        self.cancel_btn = QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_queries)
+        self.cancel_btn.hide()
+        self.profiler_btn = QPushButton("Profiler")
+        self.profiler_btn.setCheckable(True)
+        self.profiler_btn.setToolTip("Time queries and UI phases and show them in a log pane")
+        
         # Status label
         self.status_label = QLabel("No database opened")
+        self.throughput_label = QLabel()
+        self.throughput_label.setStyleSheet(f"color: {Colors.TEXT_SECONDARY};")
         
         # Add all controls to toolbar
         toolbar.addLayout(db_controls)
         toolbar.addStretch()
         toolbar.addLayout(view_controls)
+        toolbar.addWidget(self.profiler_btn)
         toolbar.addStretch()
+        toolbar.addWidget(self.progress_bar)
+        toolbar.addWidget(self.cancel_btn)
         toolbar.addWidget(self.status_label)
+        toolbar.addWidget(self.throughput_label)
         
         layout.addLayout(toolbar)
         
@@ -888,21 +3869,89 @@ class DatabaseViewer(QMainWindow):
         self.tables_tab = QWidget()
         self.relations_tab = QWidget()
         
+        self.query_console = QueryConsole()
+        self.statistics_panel = StatisticsPanel()
+        self.index_advisor = IndexAdvisorPanel()
+        
         self.tab_widget.addTab(self.tables_tab, "Tables")
         self.tab_widget.addTab(self.relations_tab, "Relationships")
+        self.tab_widget.addTab(self.query_console, "Query")
+        self.tab_widget.addTab(self.statistics_panel, "Statistics")
+        self.tab_widget.addTab(self.index_advisor, "Indexes")
         
         # Setup tables tab
         tables_layout = QVBoxLayout(self.tables_tab)
-        self.table_widget = EnhancedTableWidget()
+        table_actions = QHBoxLayout()
+        self.build_index_btn = ModernButton("Build Search Index")
+        self.build_index_btn.setToolTip("Index the text columns of this table for instant search")
+        self.build_index_btn.clicked.connect(self.build_search_index)
+        self.build_index_btn.setEnabled(False)
+        table_actions.addWidget(self.build_index_btn)
+        self.export_btn = ModernButton("Export...")
+        self.export_btn.setToolTip("Save the rows shown, with the current filter, to a file")
+        self.export_btn.clicked.connect(self.export_table)
+        self.export_btn.setEnabled(False)
+        table_actions.addWidget(self.export_btn)
+        table_actions.addStretch()
+        tables_layout.addLayout(table_actions)
+        self.table_widget = EnhancedTableView()
+        # Clicking a header sorts in SQL, see SqliteTableModel.sort
+        self.table_widget.setSortingEnabled(True)
+        self.table_widget.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.table_widget.horizontalHeader().sortIndicatorChanged.connect(self.check_sort_index)
         tables_layout.addWidget(self.table_widget)
         
         # Setup relations tab with enhanced QGraphicsView
-        relations_layout = QVBoxLayout(self.relations_tab)
+        relations_layout = QHBoxLayout(self.relations_tab)
         self.scene = QGraphicsScene()
+        # Locate items under the cursor and in exposed regions through a BSP tree
+        self.scene.setItemIndexMethod(QGraphicsScene.ItemIndexMethod.BspTreeIndex)
         self.view = EnhancedGraphicsView(self.scene)
+        self.view.graph = self.graph
         relations_layout.addWidget(self.view)
         
-        layout.addWidget(self.tab_widget)
+        # Overview of the whole diagram next to the view
+        self.minimap = MinimapWidget(self.view)
+        self.minimap.set_graph(self.graph)
+        relations_layout.addWidget(self.minimap, alignment=Qt.AlignmentFlag.AlignTop)
+        
+        # Cards are created for what is around the viewport once scrolling settles
+        self.materialize_timer = QTimer(self)
+        self.materialize_timer.setSingleShot(True)
+        self.materialize_timer.setInterval(50)
+        self.materialize_timer.timeout.connect(self.materialize_visible)
+        self.view.viewport_changed.connect(self.materialize_timer.start)
+        
+        # Profiler log below the tabs, only shown while profiling
+        self.profiler_pane = ProfilerPane()
+        self.profiler_pane.hide()
+        self.profiler_btn.toggled.connect(self.profiler_pane.set_active)
+        main_splitter = QSplitter(Qt.Orientation.Vertical)
+        main_splitter.addWidget(self.tab_widget)
+        main_splitter.addWidget(self.profiler_pane)
+        main_splitter.setSizes([600, 200])
+        layout.addWidget(main_splitter)
+        
+    def closeEvent(self, event):
+        self.close_executor()
+        super().closeEvent(event)
+        
+    def close_executor(self):
+        if self.executor:
+            self.executor.close()
+        if self.search_index:
+            self.search_index.close()
+            self.search_index = None
+        if self.page_cache:
+            self.page_cache.close()
+            self.page_cache = None
+        if self.table_stats:
+            self.table_stats.close()
+            self.table_stats = None
+        if self.connections:
+            self.connections.close()
+            self.connections = None
+            self.current_db = None
         
     def zoom_in(self):
         self.view.scale(1.2, 1.2)
@@ -913,83 +3962,41 @@ class DatabaseViewer(QMainWindow):
     def reset_view(self):
         self.view.resetTransform()
         self.view.fitInView(self.scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self.materialize_timer.start()
         
     def rearrange_cards(self, layout_type):
-        if not self.current_db or not hasattr(self, 'cards'):
+        if not self.executor:
             return
             
-        cards = list(self.cards.values())
+        slots, sizes, edges = self.graph.layout_input()
+        engine = LAYOUT_ENGINES[layout_type]
         
-        if layout_type == "Grid Layout":
-            # Arrange in grid
-            cols = int(math.sqrt(len(cards))) + 1
-            for i, card in enumerate(cards):
-                row = i // cols
-                col = i % cols
-                card.setPos(col * 250 + 50, row * 300 + 50)
-                
-        elif layout_type == "Circular Layout":
-            # Arrange in circle
-            center_x = 600
-            center_y = 400
-            radius = min(300, 100 * len(cards))
-            angle_step = 2 * math.pi / len(cards)
-            
-            for i, card in enumerate(cards):
-                angle = i * angle_step
-                x = center_x + radius * math.cos(angle)
-                y = center_y + radius * math.sin(angle)
-                card.setPos(x - card.width/2, y - card.height/2)
-                
-        else:  # Spring Layout
-            # Simple force-directed layout
-            iterations = 50
-            k = 300  # Optimal distance between nodes
-            
-            # Initialize random positions
-            import random
-            for card in cards:
-                card.setPos(random.uniform(0, 1000), random.uniform(0, 800))
-            
-            for _ in range(iterations):
-                # Calculate repulsive forces
-                for i, card1 in enumerate(cards):
-                    fx, fy = 0, 0
-                    pos1 = card1.pos()
-                    
-                    # Repulsion from other cards
-                    for card2 in cards:
-                        if card1 != card2:
-                            pos2 = card2.pos()
-                            dx = pos1.x() - pos2.x()
-                            dy = pos1.y() - pos2.y()
-                            dist = math.sqrt(dx*dx + dy*dy)
-                            if dist < 1: dist = 1
-                            
-                            # Repulsive force
-                            f = k*k / dist
-                            fx += (dx/dist) * f
-                            fy += (dy/dist) * f
-                    
-                    # Attraction along edges
-                    for conn in card1.connections:
-                        other = conn.end_card if conn.start_card == card1 else conn.start_card
-                        pos2 = other.pos()
-                        dx = pos1.x() - pos2.x()
-                        dy = pos1.y() - pos2.y()
-                        dist = math.sqrt(dx*dx + dy*dy)
-                        if dist < 1: dist = 1
-                        
-                        # Attractive force
-                        f = dist*dist / k
-                        fx -= (dx/dist) * f
-                        fy -= (dy/dist) * f
-                    
-                    # Update position
-                    card1.setPos(pos1.x() + fx*0.1, pos1.y() + fy*0.1)
+        # Positions are computed off the GUI thread and applied to the cards once
+        if self.layout_task is not None:
+            self.executor.cancel(self.layout_task)
+        self.layout_task = self.executor.submit(
+            lambda conn: engine.compute(sizes, edges),
+            on_result=lambda positions: self.apply_layout(slots, positions),
+            on_error=self.show_query_error, name=f"{type(engine).__name__}.compute")
+        
+    @PROFILER.profiled("ui")
+    def apply_layout(self, slots, positions):
+        self.layout_task = None
+        if slots != list(self.graph.slots.values()):
+            return  # The schema changed while the layout was running
+        for slot, (x, y) in zip(slots, positions):
+            slot.setPos(x, y)
         
         # Update view
-        self.view.fitInView(self.scene.sceneRect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self.update_scene_rect()
+        self.view.fitInView(self.graph.bounding_rect(), Qt.AspectRatioMode.KeepAspectRatio)
+        self.view.viewport().update()
+        self.minimap.invalidate()
+        self.materialize_timer.start()
+        
+    def update_scene_rect(self):
+        """Size the scene to the whole diagram, most of which may have no items"""
+        self.scene.setSceneRect(self.graph.bounding_rect().adjusted(-200, -200, 200, 200))
 
     def open_database(self):
         file_name, _ = QFileDialog.getOpenFileName(
@@ -1000,26 +4007,83 @@ class DatabaseViewer(QMainWindow):
         )
         
         if file_name:
-            try:
-                self.current_db = sqlite3.connect(file_name)
-                self.status_label.setText(f"Connected to: {file_name}")
-                self.create_table_btn.setEnabled(True)
-                self.edit_table_btn.setEnabled(True)
-                self.load_tables()
-                self.visualize_relationships()
-            except sqlite3.Error as e:
-                self.status_label.setText(f"Error: {str(e)}")
+            self.load_database(file_name)
+            
+    def load_database(self, file_name):
+        """Connect to a database file and start loading its tables and diagram"""
+        try:
+            self.current_table = None
+            self.catalog = SchemaCatalog()
+            self.table_widget.setModel(None)
+            self.build_index_btn.setEnabled(False)
+            self.export_btn.setEnabled(False)
+            self.close_executor()
+            self.layout_task = None
+            self.reset_relationship_scene()
+            self.connections = ConnectionManager(
+                file_name, **OPEN_MODES[self.open_mode_combo.currentText()],
+                pragmas=PERFORMANCE_PROFILES[self.profile_combo.currentText()])
+            self.current_db = self.connections.writer
+            self.executor = QueryExecutor(self.connections, parent=self)
+            self.executor.busy_changed.connect(self.on_busy_changed)
+            self.search_index = SearchIndex(self.executor)
+            self.page_cache = PageCache(self.connections)
+            self.table_stats = TableStatistics(self.connections)
+            self.observed_queries = ObservedQueries()
+            self.index_advisor.tree.clear()
+            self.status_label.setText(f"Connected to: {file_name}"
+                                      + (" (read-only)" if self.connections.read_only else ""))
+            settings = self.connections.effective_settings()
+            self.cache_settings = (f"mmap {format_bytes(settings['mmap_size'])}, "
+                                   f"cache {format_bytes(settings['cache_bytes'])}")
+            self.throughput_label.setText(self.cache_settings)
+            writable = self.current_db is not None
+            self.create_table_btn.setEnabled(writable)
+            self.edit_table_btn.setEnabled(writable)
+            self.import_btn.setEnabled(writable)
+            self.load_tables()
+            self.visualize_relationships()
+        except sqlite3.Error as e:
+            self.status_label.setText(f"Error: {str(e)}")
+    
+    def on_busy_changed(self, busy):
+        self.progress_bar.setVisible(busy)
+        self.cancel_btn.setVisible(busy)
+        if not busy and self.connections:
+            summary = self.connections.read_meter.summary()
+            if summary:
+                self.throughput_label.setText(f"{summary} ({self.cache_settings})")
+    
+    def cancel_queries(self):
+        if self.executor:
+            self.executor.cancel_all()
+            self.status_label.setText("Query cancelled")
+    
+    def show_query_error(self, message):
+        self.status_label.setText(f"Error: {message}")
+    
+    def with_catalog(self, callback):
+        """Refresh the schema catalog on a worker if the schema changed, then call back with it"""
+        def on_result(catalog):
+            self.catalog = catalog
+            callback(catalog)
+            
+        self.executor.submit(lambda conn: self.catalog.refreshed(conn),
+                             on_result=on_result, on_error=self.show_query_error,
+                             name="SchemaCatalog.refreshed")
     
     def load_tables(self):
-        if not self.current_db:
+        if not self.executor:
             return
             
-        cursor = self.current_db.cursor()
-        
-        # Get list of tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
-        
+        def on_catalog(catalog):
+            self.populate_table_buttons(catalog.tables)
+            self.statistics_panel.load_estimates(catalog)
+            
+        self.with_catalog(on_catalog)
+    
+    @PROFILER.profiled("ui")
+    def populate_table_buttons(self, tables):
         # Create layout for table buttons
         self.table_buttons_layout = QHBoxLayout()
         table_select_layout = QVBoxLayout()  # Changed to vertical layout
@@ -1038,8 +4102,8 @@ class DatabaseViewer(QMainWindow):
         # Add table buttons
         self.table_buttons_layout.addStretch()
         for table in tables:
-            table_btn = ModernButton(table[0])
-            table_btn.clicked.connect(lambda checked, t=table[0]: self.show_table_content(t))
+            table_btn = ModernButton(table)
+            table_btn.clicked.connect(lambda checked, t=table: self.show_table_content(t))
             self.table_buttons_layout.addWidget(table_btn)
         self.table_buttons_layout.addStretch()
         
@@ -1055,111 +4119,84 @@ class DatabaseViewer(QMainWindow):
                 widget.setVisible(search_text in table_name)
     
     def show_table_content(self, table_name):
-        cursor = self.current_db.cursor()
+        if not self.executor:
+            return
+            
+        self.with_catalog(lambda catalog: self.display_table(catalog.table_metadata(table_name)))
+    
+    @PROFILER.profiled("ui")
+    def display_table(self, metadata):
+        old_model = self.table_widget.model()
+        if old_model is not None:
+            old_model.close()
         
-        # Get column info and relationships
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns = cursor.fetchall()
+        # Rows are paged in by the model as the view scrolls
+        model = SqliteTableModel(metadata['table_name'], metadata['columns'],
+                                 metadata['order_keys'], metadata['relationships'],
+                                 executor=self.executor,
+                                 filter_text=self.search_box.text(),
+                                 search_index=self.search_index,
+                                 page_cache=self.page_cache,
+                                 read_meter=self.connections.read_meter)
+        model.load_failed.connect(self.show_query_error)
+        self.table_widget.setModel(model)
+        self.table_widget.horizontalHeader().setSortIndicator(-1, Qt.SortOrder.AscendingOrder)
+        self.current_table = metadata['table_name']
+        self.build_index_btn.setEnabled(True)
+        self.export_btn.setEnabled(True)
+        model.rowsInserted.connect(self.resize_columns_once)
         
-        # Get foreign keys
-        cursor.execute(f"PRAGMA foreign_key_list({table_name})")
-        foreign_keys = cursor.fetchall()
+        # Switch to Tables tab
+        self.tab_widget.setCurrentWidget(self.tables_tab)
+    
+    def check_sort_index(self, column, order):
+        """Offer to index the sort column of a large table, as every page would sort the whole table"""
+        model = self.table_widget.model()
+        if model is None or model.sort_column is None or self.table_stats is None:
+            return
+        table = model.table_name
+        name = model.columns[model.sort_column][0]
+        rows = self.table_stats.rows(table)
+        sql = create_index_sql(table, [name])
+        if (rows is None or rows < SORT_INDEX_ROWS or (table, name) in self.declined_indexes
+                or sql in self.creating_indexes or table not in self.catalog.columns
+                or self.catalog.is_indexed(table, [name])):
+            return
+        if self.current_db is None:
+            self.status_label.setText(f"Sorting {table} by {name} is slow without an index: {sql}")
+            return
+        answer = QMessageBox.question(
+            self, "Sort",
+            f"{table} has about {rows:,} rows and no index on {name}, so every page "
+            f"sorts the whole table. Create the index now?\n\n{sql}")
+        if answer != QMessageBox.StandardButton.Yes:
+            self.declined_indexes.add((table, name))
+            return
+        # Pages loaded from now on are read through the new index
+        self.create_index(sql, f"{table} ({name})")
+
+    def create_index(self, sql, description, on_created=None):
+        """Create an index on a worker, then refresh the catalog and call on_created with it"""
+        if sql in self.creating_indexes:
+            return
+        self.creating_indexes.add(sql)
         
-        # Get tables that reference this table
-        referenced_by = {}
-        for other_table in self.get_all_tables():
-            if other_table != table_name:
-                cursor.execute(f"PRAGMA foreign_key_list({other_table})")
-                other_fks = cursor.fetchall()
-                for fk in other_fks:
-                    if fk[2] == table_name:  # if this table is referenced
-                        if fk[4] not in referenced_by:  # referenced column
-                            referenced_by[fk[4]] = []
-                        referenced_by[fk[4]].append(other_table)
-        
-        # Get table data
-        cursor.execute(f"SELECT * FROM {table_name}")
-        data = cursor.fetchall()
-        
-        # Set up table widget
-        self.table_widget.setRowCount(len(data))
-        self.table_widget.setColumnCount(len(columns))
-        
-        # Clear previous relationships
-        self.table_widget.relationships.clear()
-        
-        # Set headers and collect relationship info
-        headers = []
-        for i, col in enumerate(columns):
-            col_name = col[1]
-            col_type = col[2]
-            is_pk = bool(col[5])
-            
-            # Check if it's a foreign key
-            is_fk = False
-            fk_ref = None
-            for fk in foreign_keys:
-                if fk[3] == col_name:
-                    is_fk = True
-                    fk_ref = {'table': fk[2], 'column': fk[4]}
-                    break
+        def on_result(_):
+            self.status_label.setText(f"Created index on {description}")
+            self.with_catalog(on_created or (lambda catalog: None))
             
-            # Create header with relationship indicators
-            if is_pk:
-                header_text = f"🔑 {col_name}"
-                self.table_widget.relationships[i] = {
-                    'type': 'pk',
-                    'referenced_by': referenced_by.get(col_name, [])
-                }
-            elif is_fk:
-                header_text = f"🔗 {col_name}"
-                self.table_widget.relationships[i] = {
-                    'type': 'fk',
-                    'ref_table': fk_ref['table'],
-                    'ref_column': fk_ref['column']
-                }
-            else:
-                header_text = col_name
+        def on_error(message):
+            QMessageBox.critical(self, "Error", f"Failed to create index: {message}")
             
-            headers.append(f"{header_text} ({col_type})")
-        
-        self.table_widget.setHorizontalHeaderLabels(headers)
-        
-        # Style the headers based on relationships
-        header = self.table_widget.horizontalHeader()
-        for i in range(len(columns)):
-            if i in self.table_widget.relationships:
-                rel = self.table_widget.relationships[i]
-                if rel['type'] == 'pk':
-                    header.model().setHeaderData(i, Qt.Orientation.Horizontal, 
-                                               QColor("#FFD700"), Qt.ItemDataRole.BackgroundRole)
-                elif rel['type'] == 'fk':
-                    header.model().setHeaderData(i, Qt.Orientation.Horizontal, 
-                                               QColor("#2196F3"), Qt.ItemDataRole.BackgroundRole)
-        
-        # Fill data
-        for i, row in enumerate(data):
-            for j, value in enumerate(row):
-                item = QTableWidgetItem(str(value))
-                item.setFlags(item.flags() & ~Qt.ItemFlag.ItemIsEditable)  # Make read-only
-                
-                # Style cells based on relationships
-                if j in self.table_widget.relationships:
-                    rel = self.table_widget.relationships[j]
-                    if rel['type'] == 'pk':
-                        item.setBackground(QColor(Colors.PK_BACKGROUND))
-                        item.setForeground(QColor(Colors.TEXT_PRIMARY))
-                    elif rel['type'] == 'fk':
-                        item.setBackground(QColor(Colors.FK_BACKGROUND))
-                        item.setForeground(QColor(Colors.TEXT_PRIMARY))
-                
-                self.table_widget.setItem(i, j, item)
-        
+        self.status_label.setText(f"Creating index on {description}...")
+        self.executor.submit(create_index, self.executor.db_path, sql,
+                             on_result=on_result, on_error=on_error,
+                             on_done=lambda: self.creating_indexes.discard(sql))
+
+    def resize_columns_once(self):
+        model = self.sender()
+        model.rowsInserted.disconnect(self.resize_columns_once)
         self.table_widget.resizeColumnsToContents()
-        self.table_widget.resizeRowsToContents()
-        
-        # Switch to Tables tab
-        self.tab_widget.setCurrentWidget(self.tables_tab)
     
     def show_related_table(self, table_name):
         """Show the related table when clicking on a foreign key relationship"""
@@ -1167,148 +4204,250 @@ class DatabaseViewer(QMainWindow):
     
     def get_all_tables(self):
         """Get list of all tables in the database"""
-        cursor = self.current_db.cursor()
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        return [table[0] for table in cursor.fetchall()]
+        self.catalog = self.catalog.refreshed(self.current_db)
+        return list(self.catalog.tables)
     
-    def get_table_columns(self, table_name):
-        """Get column information including relationships for a table"""
-        cursor = self.current_db.cursor()
-        
-        # Get column info
-        cursor.execute(f"PRAGMA table_info({table_name})")
-        columns_info = cursor.fetchall()
-        
-        # Get foreign keys
-        cursor.execute(f"PRAGMA foreign_key_list({table_name})")
-        foreign_keys = cursor.fetchall()
-        
-        columns = []
-        for col in columns_info:
-            column = {
-                'name': col[1],
-                'type': col[2],
-                'pk': bool(col[5]),  # Is primary key
-                'fk': False,
-                'fk_ref': None
-            }
+    def visualize_relationships(self):
+        if not self.executor:
+            return
             
-            # Check if column is a foreign key
-            for fk in foreign_keys:
-                if fk[3] == column['name']:
-                    column['fk'] = True
-                    column['fk_ref'] = {'table': fk[2], 'column': fk[4]}
+        self.with_catalog(self.sync_relationship_scene)
+    
+    def reset_relationship_scene(self):
+        self.scene.clear()
+        self.cards = {}
+        self.connectors = {}
+        self.graph = SchemaGraph()
+        self.view.graph = self.graph
+        self.minimap.set_graph(self.graph)
+    
+    @PROFILER.profiled("ui")
+    def sync_relationship_scene(self, catalog):
+        """Bring the diagram up to the catalog's schema, touching only what changed"""
+        if catalog.schema_version == self.graph.schema_version:
+            return
             
-            columns.append(column)
+        first_build = not self.graph.slots
+        removed_slots, added_slots, removed_edges, added_edges = self.graph.sync(catalog)
+        
+        for key in removed_edges:
+            self.remove_connector(key)
+        for slot in removed_slots:
+            card = self.cards.pop(slot.table_name, None)
+            if card is not None:
+                self.scene.removeItem(card)
+        for key in added_edges:
+            slot, parent = self.graph.edges[key]
+            if slot.card is not None or parent.card is not None:
+                self.add_connector(key)
+        
+        if first_build:
+            # Apply initial layout
+            self.rearrange_cards(self.layout_combo.currentText())
+            return
             
-        return columns
+        self.place_new_slots([slot for slot in added_slots if not slot.placed])
+        self.update_scene_rect()
+        self.view.viewport().update()
+        self.minimap.invalidate()
+        self.materialize_timer.start()
     
-    def visualize_relationships(self):
-        if not self.current_db:
+    def place_new_slots(self, slots):
+        """Grid new tables below the diagram instead of laying everything out again"""
+        if not slots:
             return
+        placed = QRectF()
+        for slot in self.graph.slots.values():
+            if slot.placed:
+                placed = placed.united(slot.rect())
+        positions = LAYOUT_ENGINES["Grid Layout"].compute([(slot.width, slot.height) for slot in slots], [])
+        for slot, (x, y) in zip(slots, positions):
+            slot.setPos(placed.left() + x, placed.bottom() + y)
+    
+    @PROFILER.profiled("ui")
+    def materialize_visible(self):
+        """Create cards for the slots around the viewport and drop those far away from it"""
+        if self.view.transform().m11() < TableCard.LOD_BLOCK:
+            return  # Cards would only be drawn as blocks, just like the placeholders
             
-        self.scene.clear()
-        cursor = self.current_db.cursor()
+        visible = self.view.mapToScene(self.view.viewport().rect()).boundingRect()
+        near = visible.adjusted(-visible.width() / 2, -visible.height() / 2,
+                                visible.width() / 2, visible.height() / 2)
+        far = visible.adjusted(-visible.width(), -visible.height(),
+                               visible.width(), visible.height())
+        for slot in self.graph.slots.values():
+            if slot.card is None:
+                if slot.placed and near.intersects(slot.rect()):
+                    self.materialize(slot)
+            elif not far.intersects(slot.rect()) and self.scene.mouseGrabberItem() is not slot.card:
+                self.release(slot)
+    
+    def materialize(self, slot):
+        card = TableCard(slot.table_name, slot.columns)
+        card.setPos(slot.x, slot.y)
+        card.slot = slot
+        card.connections = slot.connections
+        slot.card = card
+        for conn in list(slot.connections):
+            conn.replace_endpoint(slot, card)
+        self.scene.addItem(card)
+        self.cards[slot.table_name] = card
         
-        # Get all tables
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table';")
-        tables = cursor.fetchall()
+        for key in self.graph.edges_by_table[slot.table_name]:
+            if key not in self.connectors:
+                self.add_connector(key)
+    
+    def release(self, slot):
+        card = self.cards.pop(slot.table_name)
+        card.slot = None
+        slot.card = None
+        for conn in list(slot.connections):
+            conn.replace_endpoint(card, slot)
+        self.scene.removeItem(card)
         
-        # Create cards
-        self.cards = {}
-        for i, table in enumerate(tables):
-            table_name = table[0]
-            columns = self.get_table_columns(table_name)
-            
-            # Create card
-            card = TableCard(table_name, columns)
-            self.scene.addItem(card)
-            self.cards[table_name] = card
-        
-        # Create connections
-        for table_name, card in self.cards.items():
-            for column in card.columns:
-                if column['fk']:
-                    ref = column['fk_ref']
-                    if ref['table'] in self.cards:
-                        ref_card = self.cards[ref['table']]
-                        ref_col_idx = next(i for i, col in enumerate(ref_card.columns) 
-                                         if col['name'] == ref['column'])
-                        
-                        connector = Connector(
-                            card,
-                            ref_card,
-                            next(i for i, col in enumerate(card.columns) if col['name'] == column['name']),
-                            ref_col_idx
-                        )
-                        self.scene.addItem(connector)
-        
-        # Apply initial layout
-        self.rearrange_cards(self.layout_combo.currentText())
+        # Edges between two placeholders are drawn by the view
+        for key in self.graph.edges_by_table[slot.table_name]:
+            child, parent = self.graph.edges[key]
+            if child.card is None and parent.card is None:
+                self.remove_connector(key)
+    
+    def add_connector(self, key):
+        slot, parent = self.graph.edges[key]
+        connector = Connector(slot.anchor(), parent.anchor(), key[1], key[3])
+        self.scene.addItem(connector)
+        self.connectors[key] = connector
+    
+    def remove_connector(self, key):
+        connector = self.connectors.pop(key, None)
+        if connector is not None:
+            connector.detach()
+            self.scene.removeItem(connector)
 
+    def schedule_filter(self):
+        self.filter_timer.start()
+        
     def filter_content(self):
-        search_text = self.search_box.text().lower()
+        search_text = self.search_box.text()
         
         # Filter table buttons
-        for i in range(self.table_buttons_layout.count()):
-            widget = self.table_buttons_layout.itemAt(i).widget()
-            if isinstance(widget, QPushButton):
-                table_name = widget.text().lower()
-                widget.setVisible(search_text in table_name)
+        if hasattr(self, 'table_buttons_layout'):
+            for i in range(self.table_buttons_layout.count()):
+                widget = self.table_buttons_layout.itemAt(i).widget()
+                if isinstance(widget, QPushButton):
+                    table_name = widget.text().lower()
+                    widget.setVisible(search_text.lower() in table_name)
         
-        # Filter table content if a table is currently displayed
-        if self.table_widget.rowCount() > 0:
-            for row in range(self.table_widget.rowCount()):
-                row_visible = False
-                for col in range(self.table_widget.columnCount()):
-                    item = self.table_widget.item(row, col)
-                    if item and search_text in item.text().lower():
-                        row_visible = True
-                        break
-                self.table_widget.setRowHidden(row, not row_visible)
+        # Filter table content in SQLite; matching rows are paged in as they are found
+        model = self.table_widget.model()
+        if model is None:
+            return
+        if search_text and self.search_index and self.search_index.covers(model.table_name):
+            # Bring the search index up to date with the database before using it
+            self.executor.submit(self.search_index.refresh, model.table_name, model.columns,
+                                 on_result=lambda rebuilt: self.apply_filter(model),
+                                 on_error=self.show_query_error)
+        else:
+            model.set_filter(search_text)
+    
+    def apply_filter(self, model):
+        # Skip models that were replaced while the search index was refreshing
+        if model is self.table_widget.model():
+            model.set_filter(self.search_box.text())
+    
+    def build_search_index(self):
+        if not self.current_table or not self.search_index:
+            return
+            
+        table = self.current_table
+        if table in self.catalog.without_rowid:
+            QMessageBox.warning(self, "Error", "Search indexes need a table with a rowid")
+            return
+        rows = self.table_stats.rows(table)
+        if rows is not None and rows > LARGE_TABLE_ROWS:
+            answer = QMessageBox.question(
+                self, "Build Search Index",
+                f"{table} has about {rows:,} rows. Indexing reads all of them and may take a while. Continue?")
+            if answer != QMessageBox.StandardButton.Yes:
+                return
+        columns = self.catalog.table_metadata(table)['columns']
+        self.status_label.setText(f"Building search index for {table}...")
+        self.executor.submit(self.search_index.build, table, columns,
+                             on_result=lambda t: self.status_label.setText(f"Search index ready for {t}"),
+                             on_error=self.show_query_error)
+
+    def export_table(self):
+        model = self.table_widget.model()
+        if model is None:
+            return
+            
+        query, params = model.export_query()
+        self.export_rows(query, params, model.table_name)
+        
+    def export_rows(self, query, params, name):
+        """Ask for a file and stream the rows of a query into it on a worker"""
+        filters = {"CSV (*.csv)": "csv", "JSON Lines (*.jsonl)": "jsonl"}
+        if "parquet" in ROW_WRITERS:
+            filters["Parquet (*.parquet)"] = "parquet"
+        path, selected = QFileDialog.getSaveFileName(self, "Export Rows", f"{name}.csv", ";;".join(filters))
+        if not path:
+            return
+            
+        fmt = filters[selected]
+        self.status_label.setText(f"Exporting {name}...")
+        self.executor.submit(
+            export_query, query, params, path, fmt,
+            on_rows=lambda written: self.status_label.setText(f"Exporting {name}: {written:,} rows written"),
+            on_result=lambda _: self.status_label.setText(f"Exported {name} to {path}"),
+            on_error=self.show_query_error)
 
     def create_table(self):
         if not self.current_db:
             return
             
-        dialog = CreateTableDialog(self, self.current_db)
+        dialog = CreateTableDialog(self, self.current_db, self.catalog)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.load_tables()
             self.visualize_relationships()
             
+    def import_data(self):
+        if not self.current_db:
+            return
+            
+        path, _ = QFileDialog.getOpenFileName(
+            self, "Import Data", "", "CSV or JSON Lines (*.csv *.jsonl *.ndjson);;All Files (*)")
+        if not path:
+            return
+        try:
+            source = ImportSource(path)
+        except (OSError, ValueError) as e:
+            QMessageBox.critical(self, "Error", str(e))
+            return
+            
+        dialog = ImportTableDialog(self, self.current_db, source, self.catalog)
+        if dialog.exec() != QDialog.DialogCode.Accepted:
+            source.close()
+            return
+            
+        table = dialog.table_name.text()
+        self.status_label.setText(f"Importing {table}...")
+        self.executor.submit(
+            import_rows, self.executor.db_path, dialog.query, table, dialog.column_names, source,
+            on_rows=lambda progress: self.status_label.setText(
+                f"Importing {table}: {progress[1]:.0%} ({progress[0]:,} rows)"),
+            on_result=lambda _: self.import_finished(table),
+            on_error=self.show_query_error)
+            
+    def import_finished(self, table):
+        self.status_label.setText(f"Imported {table}")
+        self.load_tables()
+        self.visualize_relationships()
+            
     def edit_table(self):
         if not self.current_db:
             return
             
-        # Get the current table if one is selected
-        current_table = None
-        if self.table_widget.rowCount() > 0:
-            # Get all column headers and find the table name from any of them
-            for col in range(self.table_widget.columnCount()):
-                header_text = self.table_widget.horizontalHeaderItem(col).text()
-                # Extract base column name without type info
-                base_name = header_text.split('(')[0].strip()
-                # If it's a PK or FK column, remove the indicator
-                if base_name.startswith('🔑 '):
-                    base_name = base_name[2:].strip()
-                elif base_name.startswith('🔗 '):
-                    base_name = base_name[2:].strip()
-                
-                # Get the table name from PRAGMA table_info
-                cursor = self.current_db.cursor()
-                cursor.execute("SELECT name FROM sqlite_master WHERE type='table'")
-                tables = [row[0] for row in cursor.fetchall()]
-                
-                # Find the table that contains this column
-                for table in tables:
-                    cursor.execute(f'PRAGMA table_info("{table}")')
-                    columns = cursor.fetchall()
-                    if any(col[1] == base_name for col in columns):
-                        current_table = table
-                        break
-                
-                if current_table:
-                    break
+        # Edit the table currently shown in the Tables tab, if any
+        current_table = self.current_table
             
         # If no table is selected or found, show a dialog to choose one
         if not current_table:
@@ -1341,7 +4480,7 @@ class DatabaseViewer(QMainWindow):
                 return
                 
         # Open the edit dialog
-        dialog = EditTableDialog(self, self.current_db, current_table)
+        dialog = EditTableDialog(self, self.current_db, current_table, self.catalog)
         if dialog.exec() == QDialog.DialogCode.Accepted:
             self.show_table_content(current_table)
             self.visualize_relationships()
@@ -1353,5 +4492,122 @@ def main():
     viewer.show()
     sys.exit(app.exec())
 
+EXPORT_FORMATS = ("svg", "png", "dot")
+MAX_EXPORT_IMAGE_SIZE = 8192  # PNGs of larger diagrams are scaled down to this many pixels
+
+def write_dot(graph, out):
+    """Write the graph as Graphviz DOT, one table at a time"""
+    def quote(name):
+        return '"' + name.replace('\\', '\\\\').replace('"', '\\"') + '"'
+        
+    out.write('digraph schema {\n')
+    out.write('    graph [rankdir=LR];\n')
+    out.write('    node [shape=plaintext, fontname="Segoe UI"];\n')
+    for slot in graph.slots.values():
+        rows = []
+        for i, column in enumerate(slot.columns):
+            text = html.escape(f"{column['name']} ({column['type']})")
+            if column['pk']:
+                text = f"<b>{text}</b>"
+            elif column['fk']:
+                text = f"<i>{text}</i>"
+            rows.append(f'<tr><td port="c{i}" align="left">{text}</td></tr>')
+        out.write(f'    {quote(slot.table_name)} [label=<<table border="0" cellborder="1" cellspacing="0">'
+                  f'<tr><td bgcolor="{Colors.PRIMARY}"><b>{html.escape(slot.table_name)}</b></td></tr>'
+                  f'{"".join(rows)}</table>>];\n')
+    for table, column, parent, parent_column in graph.edges:
+        out.write(f'    {quote(table)}:c{column}:e -> {quote(parent)}:c{parent_column}:w;\n')
+    out.write('}\n')
+
+def render_diagram(graph, painter):
+    """Paint the laid out graph card by card, without building a scene"""
+    option = QStyleOptionGraphicsItem()
+    for slot in graph.slots.values():
+        painter.save()
+        painter.translate(slot.x, slot.y)
+        TableCard(slot.table_name, slot.columns).paint(painter, option, None)
+        painter.restore()
+    for (_, column, _, parent_column), (slot, parent) in graph.edges.items():
+        connector = Connector(slot, parent, column, parent_column)
+        painter.save()
+        connector.paint(painter, option, None)
+        painter.restore()
+        connector.detach()
+
+def export_diagram(db_path, output_path, fmt, layout_type="Layered Layout", scale=None):
+    """Lay out the schema of a database and save the diagram as SVG, PNG or DOT"""
+    conn = open_readonly_connection(db_path)
+    try:
+        catalog = SchemaCatalog.load(conn)
+    finally:
+        conn.close()
+    graph = SchemaGraph()
+    graph.sync(catalog)
+    
+    if fmt == "dot":
+        # Graphviz does its own layout
+        with open(output_path, "w", encoding="utf-8") as out:
+            write_dot(graph, out)
+        return
+        
+    slots, sizes, edges = graph.layout_input()
+    for slot, (x, y) in zip(slots, LAYOUT_ENGINES[layout_type].compute(sizes, edges)):
+        slot.setPos(x, y)
+    bounds = graph.bounding_rect().adjusted(-20, -20, 20, 20)
+    
+    if fmt == "svg":
+        # The generator writes elements out as they are painted
+        generator = QSvgGenerator()
+        generator.setFileName(str(output_path))
+        generator.setTitle(Path(db_path).name)
+        generator.setSize(QSize(int(bounds.width()), int(bounds.height())))
+        generator.setViewBox(bounds)
+        painter = QPainter(generator)
+    else:
+        if scale is None:
+            scale = min(1.0, MAX_EXPORT_IMAGE_SIZE / max(bounds.width(), bounds.height()))
+        image = QImage(max(1, int(bounds.width() * scale)), max(1, int(bounds.height() * scale)),
+                       QImage.Format.Format_ARGB32)
+        painter = QPainter(image)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        painter.scale(scale, scale)
+        painter.translate(-bounds.left(), -bounds.top())
+        
+    painter.fillRect(bounds, QColor(Colors.BACKGROUND_DARK))
+    render_diagram(graph, painter)
+    painter.end()
+    
+    if fmt == "png" and not image.save(str(output_path), "PNG"):
+        raise OSError(f"Could not write {output_path}")
+
+def export_main(argv=None):
+    """Export relationship diagrams from the command line, without opening a window"""
+    layouts = {name.split()[0].lower(): name for name in LAYOUT_ENGINES}
+    parser = argparse.ArgumentParser(prog="db_viewer.py export",
+                                     description="Export the relationship diagram of SQLite databases.")
+    parser.add_argument("databases", nargs="+", help="SQLite database files")
+    parser.add_argument("-f", "--format", choices=EXPORT_FORMATS, default="svg")
+    parser.add_argument("-l", "--layout", choices=layouts, default="layered")
+    parser.add_argument("-o", "--output-dir", default=".", help="Directory for the exported files")
+    parser.add_argument("--scale", type=float, help="PNG scale factor (default: fit large diagrams)")
+    args = parser.parse_args(argv)
+    
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+    app = QApplication.instance() or QApplication(sys.argv[:1])
+    os.makedirs(args.output_dir, exist_ok=True)
+    
+    failed = 0
+    for db_path in args.databases:
+        output_path = Path(args.output_dir) / f"{Path(db_path).stem}.{args.format}"
+        try:
+            export_diagram(db_path, output_path, args.format, layouts[args.layout], args.scale)
+            print(f"{db_path} -> {output_path}")
+        except (sqlite3.Error, OSError) as e:
+            failed += 1
+            print(f"{db_path}: {e}", file=sys.stderr)
+    return 1 if failed else 0
+
 if __name__ == "__main__":
+    if sys.argv[1:2] == ["export"]:
+        sys.exit(export_main(sys.argv[2:]))
     main() 
\ No newline at end of file
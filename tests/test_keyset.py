@@ -0,0 +1,77 @@
+"""Keyset pagination in fetch_table_page checked against a plain ORDER BY"""
+import sqlite3
+
+import pytest
+
+pytest.importorskip("PyQt6")
+
+from db_viewer import fetch_table_page, keyset_condition
+
+PAGE = 7
+
+@pytest.fixture
+def conn():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (id INTEGER PRIMARY KEY, n INTEGER, label TEXT)")
+    # Repeated values and a NULL group, both larger than a page
+    conn.executemany("INSERT INTO t (n, label) VALUES (?, ?)",
+                     [(None if i % 4 == 0 else i % 5, f"row {i}") for i in range(60)])
+    conn.execute("CREATE INDEX t_n ON t (n)")
+    yield conn
+    conn.close()
+
+def read_all(conn, order_keys, descending=False, sort_column=False, where=None, params=()):
+    """Every row, one page at a time, continuing from the key of the last row read"""
+    rows, key = [], None
+    while True:
+        page = fetch_table_page(conn, "t", order_keys, key, PAGE, where, params,
+                                descending, sort_column)
+        rows += page
+        if len(page) < PAGE:
+            return rows
+        key = tuple(page[-1][:len(order_keys)])
+
+def test_keyset_condition_is_a_row_value_seek():
+    assert keyset_condition(["rowid"], (5,)) == ("rowid > ?", [5])
+    assert keyset_condition(["n", "rowid"], (2, 5), descending=True) == ("(n, rowid) < (?, ?)", [2, 5])
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_rowid_order(conn, descending):
+    direction = "DESC" if descending else ""
+    expected = conn.execute(f"SELECT rowid, * FROM t ORDER BY rowid {direction}").fetchall()
+    assert read_all(conn, ["rowid"], descending) == expected
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_sort_column_with_nulls(conn, descending):
+    direction = "DESC" if descending else ""
+    expected = conn.execute(
+        f"SELECT n, rowid, * FROM t ORDER BY n {direction}, rowid {direction}").fetchall()
+    rows = read_all(conn, ["n", "rowid"], descending, sort_column=True)
+    assert rows == expected
+    # NULLs come first ascending and last descending, as in SQLite's ORDER BY
+    assert (rows[0][0] is None) != descending
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_sort_column_with_filter(conn, descending):
+    direction = "DESC" if descending else ""
+    where = "label LIKE ?"
+    expected = conn.execute(
+        f"SELECT n, rowid, * FROM t WHERE {where} ORDER BY n {direction}, rowid {direction}",
+        ("%1%",)).fetchall()
+    assert read_all(conn, ["n", "rowid"], descending, True, where, ("%1%",)) == expected
+
+def test_only_nulls(conn):
+    conn.execute("UPDATE t SET n = NULL")
+    expected = conn.execute("SELECT n, rowid, * FROM t ORDER BY n, rowid").fetchall()
+    assert read_all(conn, ["n", "rowid"], sort_column=True) == expected
+
+@pytest.mark.parametrize("descending", [False, True])
+def test_sorted_pages_seek_in_the_index(conn, descending):
+    plans = []
+    conn.set_trace_callback(lambda sql: sql.startswith("SELECT") and plans.extend(
+        row[3] for row in conn.execute("EXPLAIN QUERY PLAN " + sql)))
+    try:
+        read_all(conn, ["n", "rowid"], descending, sort_column=True)
+    finally:
+        conn.set_trace_callback(None)
+    assert plans and all(plan.startswith("SEARCH") for plan in plans), plans